@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+def get_user(request):
+    """Пользователь запроса из кеша, без запросов к auth_user.
+
+    Без cookie сессии пользователь анонимный, и сессия не читается.
+    В кеше лежит пара (хеш авторизации, пользователь): запись годится,
+    только если хеш совпал с сохранённым в сессии, поэтому смена пароля
+    разлогинивает старые сессии так же, как django.contrib.auth.get_user.
+    """
+    if request.session.session_key is None:
+        return AnonymousUser()
+    user_id = request.session.get(auth.SESSION_KEY)
+    if user_id is None:
+        return AnonymousUser()
+    key = user_cache_key(user_id)
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    cached = cache.get(key)
+    if cached is not None and session_hash and constant_time_compare(
+            cached[0], session_hash):
+        return cached[1]
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, (user.get_session_auth_hash(), user),
+                  settings.USER_CACHE_TIMEOUT)
+    return user
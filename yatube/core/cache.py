@@ -0,0 +1,285 @@
+import glob
+import hashlib
+import math
+import os
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+from .signals import cache_read
+
+# L1 общий для всех потоков процесса: caches[alias] у каждого потока свой.
+_l1 = {}
+_l1_locks = {}
+
+MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """Двухуровневый кеш: LRU процесса (L1) перед общим кешем (L2).
+
+    LOCATION — алиас общего кеша из CACHES. L1 хранит записи не дольше
+    L1_TIMEOUT секунд, поэтому годится для неизменяемых ключей: фрагменты
+    и карточки адресуются версиями, а сами версии (префиксы SHARED_ONLY)
+    всегда читаются из L2 — так сброс в одном процессе виден остальным.
+
+    От лавины промахов защищают два механизма. На промахе ключа из
+    SINGLE_FLIGHT значение считает только процесс, взявший блокировку
+    в L2, остальные до LOCK_WAIT секунд ждут его результата. Незадолго
+    до истечения записи get() с вероятностью по XFetch (время расчёта
+    × EARLY_REFRESH_BETA) отдаёт промах одному процессу, пока остальные
+    ещё получают старое значение.
+
+    Блокировка и add() опираются на атомарный add() общего кеша
+    (memcached, Redis). У FileBasedCache add() — это проверка и запись
+    по отдельности, поэтому для него блокировка — файл-замок рядом
+    с данными, созданный через O_CREAT | O_EXCL.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = location
+        self._l1_timeout = options.get('L1_TIMEOUT', 5)
+        self._l1_max_entries = options.get('L1_MAX_ENTRIES', 1000)
+        self._shared_only = tuple(options.get('SHARED_ONLY', ()))
+        self._single_flight = tuple(options.get('SINGLE_FLIGHT', ()))
+        self._lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        self._lock_wait = options.get('LOCK_WAIT', 1.0)
+        self._beta = options.get('EARLY_REFRESH_BETA', 1.0)
+        self._cache = _l1.setdefault(location, OrderedDict())
+        self._lock = _l1_locks.setdefault(location, threading.Lock())
+        # Время промаха по ключу: из него set() узнаёт цену расчёта.
+        self._misses = OrderedDict()
+        self._locks = set()
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _in_l1(self, key):
+        return self._l1_timeout and not key.startswith(self._shared_only)
+
+    def _l1_get(self, key, version):
+        full_key = self.make_key(key, version)
+        with self._lock:
+            stored = self._cache.get(full_key)
+            if stored is None:
+                return None
+            expires, pickled = stored
+            if expires <= time.time():
+                del self._cache[full_key]
+                return None
+            self._cache.move_to_end(full_key)
+        return pickle.loads(pickled)
+
+    def _l1_set(self, key, entry, version):
+        expires = time.time() + self._l1_timeout
+        if entry[1] is not None:
+            expires = min(expires, entry[1])
+        pickled = pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)
+        full_key = self.make_key(key, version)
+        with self._lock:
+            self._cache[full_key] = (expires, pickled)
+            self._cache.move_to_end(full_key)
+            while len(self._cache) > self._l1_max_entries:
+                self._cache.popitem(last=False)
+
+    def _l1_delete(self, key, version):
+        with self._lock:
+            self._cache.pop(self.make_key(key, version), None)
+
+    def _missed(self, key, version):
+        self._misses[self.make_key(key, version)] = time.time()
+        while len(self._misses) > self._l1_max_entries:
+            self._misses.popitem(last=False)
+
+    def _entry(self, key, value, timeout, version):
+        """Значение с моментом истечения и временем его расчёта."""
+        now = time.time()
+        started = self._misses.pop(self.make_key(key, version), now)
+        return (value, self.get_backend_timeout(timeout), now - started)
+
+    def _lock_path(self, name, version):
+        name = hashlib.md5(self.make_key(name, version).encode()).hexdigest()
+        return os.path.join(self.shared._dir, f'{name}.lock')
+
+    def _take_lock(self, name, version):
+        """Берёт блокировку name в L2; просроченную перехватывает."""
+        if not isinstance(self.shared, FileBasedCache):
+            return self.shared.add(
+                name, True, self._lock_timeout, version=version)
+        path = self._lock_path(name, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
+                if age < self._lock_timeout:
+                    return False
+                self._drop_lock(name, version)
+        return False
+
+    def _drop_lock(self, name, version):
+        if not isinstance(self.shared, FileBasedCache):
+            self.shared.delete(name, version=version)
+            return
+        try:
+            os.remove(self._lock_path(name, version))
+        except FileNotFoundError:
+            pass
+
+    def _acquire(self, key, version):
+        acquired = self._take_lock(f'{key}:lock', version)
+        if acquired:
+            self._locks.add((key, version))
+        return acquired
+
+    def _release(self, key, version):
+        if (key, version) in self._locks:
+            self._locks.discard((key, version))
+            self._drop_lock(f'{key}:lock', version)
+
+    def _wait(self, key, version):
+        """Ждёт значение, которое считает держатель блокировки."""
+        deadline = time.monotonic() + self._lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self.shared.get(key, version=version)
+            if entry is not None:
+                return entry
+        return None
+
+    def _refresh_early(self, entry):
+        _, expires, delta = entry
+        if expires is None or not delta:
+            return False
+        jitter = -delta * self._beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= expires
+
+    def get(self, key, default=None, version=None):
+        value = self._read(key, version)
+        hit = value is not MISSING
+        cache_read.send(sender=type(self), hits=int(hit), misses=int(not hit))
+        return value if hit else default
+
+    def _read(self, key, version):
+        entry = self._l1_get(key, version) if self._in_l1(key) else None
+        if entry is None:
+            entry = self.shared.get(key, version=version)
+            if entry is None and key.startswith(self._single_flight):
+                if not self._acquire(key, version):
+                    entry = self._wait(key, version)
+            if entry is None:
+                self._missed(key, version)
+                return MISSING
+            if self._in_l1(key):
+                self._l1_set(key, entry, version)
+        if self._refresh_early(entry) and self._acquire(key, version):
+            self._missed(key, version)
+            return MISSING
+        return entry[0]
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = {}
+        rest = []
+        for key in keys:
+            entry = self._l1_get(key, version) if self._in_l1(key) else None
+            if entry is None:
+                rest.append(key)
+            else:
+                found[key] = entry[0]
+        shared = self.shared.get_many(rest, version=version)
+        for key in rest:
+            entry = shared.get(key)
+            if entry is None:
+                self._missed(key, version)
+                continue
+            if self._in_l1(key):
+                self._l1_set(key, entry, version)
+            found[key] = entry[0]
+        cache_read.send(sender=type(self), hits=len(found),
+                        misses=len(keys) - len(found))
+        return found
+
+    def has_key(self, key, version=None):
+        if self._in_l1(key) and self._l1_get(key, version) is not None:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        entry = self._entry(key, value, timeout, version)
+        self.shared.set(key, entry, self._timeout(timeout), version=version)
+        if self._in_l1(key):
+            self._l1_set(key, entry, version)
+        self._release(key, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        entry = self._entry(key, value, timeout, version)
+        if isinstance(self.shared, FileBasedCache):
+            # Проверка и запись под замком: иначе add() двух процессов
+            # может записать оба значения. Замок держится доли секунды,
+            # поэтому его ждут: проигравший должен прочитать победителя.
+            deadline = time.monotonic() + self._lock_wait
+            while not self._take_lock(f'{key}:add', version):
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+            try:
+                added = self.shared.add(
+                    key, entry, self._timeout(timeout), version=version)
+            finally:
+                self._drop_lock(f'{key}:add', version)
+        else:
+            added = self.shared.add(
+                key, entry, self._timeout(timeout), version=version)
+        if added and self._in_l1(key):
+            self._l1_set(key, entry, version)
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        entries = {key: self._entry(key, value, timeout, version)
+                   for key, value in data.items()}
+        failed = self.shared.set_many(
+            entries, self._timeout(timeout), version=version)
+        for key, entry in entries.items():
+            if self._in_l1(key):
+                self._l1_set(key, entry, version)
+            self._release(key, version)
+        return failed
+
+    def delete(self, key, version=None):
+        self._l1_delete(key, version)
+        self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._l1_delete(key, version)
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        self.shared.clear()
+        if isinstance(self.shared, FileBasedCache):
+            for path in glob.glob(os.path.join(self.shared._dir, '*.lock')):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.precompile import compile_templates
+
+
+class Command(BaseCommand):
+    help = ('Разбирает все шаблоны проекта и падает на первой же '
+            'синтаксической ошибке; для проверки перед выкладкой')
+
+    def handle(self, *args, **options):
+        compiled, errors = compile_templates()
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблонов разобрано: {compiled}'))
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.sqlite.base import apply_pragmas, writer_lock
+
+# Профиль -> (прагмы, BEGIN IMMEDIATE с очередью писателей).
+PROFILES = {
+    'default': ({}, False),
+    'production': (settings.SQLITE_PRAGMAS, True),
+}
+
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, author INTEGER, '
+    'text TEXT, created REAL)',
+    'CREATE INDEX post_created ON post (created)',
+    'CREATE INDEX post_author ON post (author)',
+)
+
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(
+        path, timeout=5, isolation_level=None, check_same_thread=False)
+    apply_pragmas(connection, pragmas)
+    return connection
+
+
+def create(path, pragmas, rows):
+    connection = connect(path, pragmas)
+    for sql in SCHEMA:
+        connection.execute(sql)
+    connection.executemany(
+        'INSERT INTO post (author, text, created) VALUES (?, ?, ?)',
+        ((i % 50, 'текст ' * 40, i) for i in range(rows)))
+    connection.close()
+
+
+def reader(connection, stop, stats):
+    """Читает первую страницу ленты, как index."""
+    while not stop.is_set():
+        try:
+            connection.execute(
+                'SELECT id, author, text FROM post '
+                'ORDER BY created DESC LIMIT 10').fetchall()
+            stats['reads'] += 1
+        except sqlite3.OperationalError:
+            stats['read_errors'] += 1
+
+
+def writer(connection, path, immediate, stop, stats, number):
+    """Пишет, как post_create: чтение счётчика и вставка в транзакции."""
+    lock = writer_lock(path)
+    while not stop.is_set():
+        started = time.perf_counter()
+        held = immediate and lock.acquire(timeout=5)
+        try:
+            connection.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            connection.execute(
+                'SELECT count(*) FROM post WHERE author = ?',
+                (number,)).fetchone()
+            connection.execute(
+                'INSERT INTO post (author, text, created) VALUES (?, ?, ?)',
+                (number, 'новый пост', time.time()))
+            connection.execute('COMMIT')
+            stats['writes'] += 1
+            stats['write_ms'].append((time.perf_counter() - started) * 1000)
+        except sqlite3.OperationalError:
+            stats['write_errors'] += 1
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+        finally:
+            if held:
+                lock.release()
+
+
+def run(profile, readers, writers, seconds, rows):
+    """Гоняет читателей и писателей на свежей базе, возвращает метрики."""
+    pragmas, immediate = PROFILES[profile]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f'{profile}.sqlite3')
+        create(path, pragmas, rows)
+        stats = {'reads': 0, 'read_errors': 0, 'writes': 0,
+                 'write_errors': 0, 'write_ms': []}
+        stop = threading.Event()
+        connections = [connect(path, pragmas)
+                       for _ in range(readers + writers)]
+        threads = [
+            threading.Thread(target=reader, args=(connection, stop, stats))
+            for connection in connections[:readers]
+        ] + [
+            threading.Thread(target=writer, args=(
+                connection, path, immediate, stop, stats, number))
+            for number, connection in enumerate(connections[readers:])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        for connection in connections:
+            connection.close()
+    latencies = sorted(stats.pop('write_ms')) or [0]
+    return {
+        'reads_per_s': round(stats['reads'] / seconds),
+        'writes_per_s': round(stats['writes'] / seconds),
+        'read_errors': stats['read_errors'],
+        'write_errors': stats['write_errors'],
+        'write_p95_ms': round(latencies[int(len(latencies) * 0.95)], 1),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность читателей и писателей SQLite '
+            'без настроек и с профилем production')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def handle(self, *args, readers, writers, seconds, rows, **options):
+        columns = ('reads_per_s', 'writes_per_s', 'read_errors',
+                   'write_errors', 'write_p95_ms')
+        self.stdout.write(f'{"profile":<12}' + ''.join(
+            f'{column:>14}' for column in columns))
+        for profile in PROFILES:
+            metrics = run(profile, readers, writers, seconds, rows)
+            self.stdout.write(f'{profile:<12}' + ''.join(
+                f'{metrics[column]:>14}' for column in columns))
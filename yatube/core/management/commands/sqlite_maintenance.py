@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+TASKS = {
+    'checkpoint': 'PRAGMA wal_checkpoint(TRUNCATE)',
+    'analyze': 'ANALYZE',
+    'vacuum': 'VACUUM',
+}
+
+
+class Command(BaseCommand):
+    help = ('Обслуживает базу SQLite: checkpoint WAL, ANALYZE и VACUUM. '
+            'С --loop работает планировщиком по SQLITE_MAINTENANCE')
+
+    def add_arguments(self, parser):
+        parser.add_argument('tasks', nargs='*', metavar='TASK',
+                            help=f'{", ".join(TASKS)}; по умолчанию все')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--loop', action='store_true',
+                            help='Не выходить, запускать задачи по расписанию')
+
+    def handle(self, *args, tasks, database, loop, **options):
+        connection = connections[database]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'{database} — не SQLite')
+        unknown = set(tasks) - set(TASKS)
+        if unknown:
+            raise CommandError(f'Неизвестные задачи: {", ".join(unknown)}')
+        tasks = tasks or list(TASKS)
+        if not loop:
+            for task in tasks:
+                self.run(connection, task)
+            return
+        due = dict.fromkeys(tasks, time.monotonic())
+        while True:
+            task = min(due, key=due.get)
+            time.sleep(max(due[task] - time.monotonic(), 0))
+            self.run(connection, task)
+            due[task] = time.monotonic() + settings.SQLITE_MAINTENANCE[task]
+
+    def run(self, connection, task):
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(TASKS[task])
+            result = cursor.fetchone() if task == 'checkpoint' else None
+        connection.close()
+        elapsed = (time.perf_counter() - started) * 1000
+        details = f' {result}' if result else ''
+        self.stdout.write(f'{task}{details}: {elapsed:.0f} мс')
@@ -0,0 +1,197 @@
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.db import connections
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from . import auth, routers, signals
+
+logger = logging.getLogger('yatube.timing')
+
+# Замер текущего запроса; в потоках вне запроса его нет.
+current = ContextVar('request_timing', default=None)
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+PLACEHOLDER_LISTS = re.compile(r'\((?:%s, )+%s\)')
+
+
+def fingerprint(sql):
+    """Запрос без параметров: одинаковый для всех итераций N+1."""
+    sql = LITERALS.sub('%s', sql)
+    return PLACEHOLDER_LISTS.sub('(%s, ...)', sql)
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = Counter()
+        self.sql = 0.0
+        self.template = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        return {sql: count for sql, count in self.queries.most_common(
+            settings.REQUEST_TIMING_DUPLICATES) if count > 1}
+
+    def server_timing(self, total):
+        return ', '.join((
+            f'sql;dur={self.sql * 1000:.1f};'
+            f'desc="queries={sum(self.queries.values())} '
+            f'duplicated={len(self.duplicates())}"',
+            f'tpl;dur={self.template * 1000:.1f}',
+            f'cache;desc="hit={self.cache_hits} miss={self.cache_misses}"',
+            f'total;dur={total * 1000:.1f}',
+        ))
+
+    def record(self, request, response, total):
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'sql_ms': round(self.sql * 1000, 1),
+            'queries': sum(self.queries.values()),
+            'duplicates': self.duplicates(),
+            'template_ms': round(self.template * 1000, 1),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+@receiver(signals.template_rendered)
+def template_timed(sender, duration, **kwargs):
+    timing = current.get()
+    if timing is not None:
+        timing.template += duration
+
+
+@receiver(signals.cache_read)
+def cache_timed(sender, hits, misses, **kwargs):
+    timing = current.get()
+    if timing is not None:
+        timing.cache_hits += hits
+        timing.cache_misses += misses
+
+
+class RequestTimingMiddleware:
+    """Считает SQL, шаблоны и кеш по запросу: лог и Server-Timing.
+
+    Подробный замер включается для доли запросов
+    REQUEST_TIMING_SAMPLE_RATE или по заголовку с REQUEST_TIMING_TOKEN;
+    остальные запросы платят только за time.perf_counter() и попадают
+    в лог, если дольше REQUEST_TIMING_SLOW_MS. SQL считается через
+    execute_wrapper, шаблоны и кеш — по сигналам template_rendered и
+    cache_read. Заголовок Server-Timing получают только запросы
+    с токеном и сотрудники: остальным незачем видеть устройство сайта.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def by_token(self, request):
+        token = settings.REQUEST_TIMING_TOKEN
+        return bool(token) and constant_time_compare(
+            request.META.get('HTTP_X_REQUEST_TIMING', ''), token)
+
+    def exposed(self, request, by_token):
+        if by_token:
+            return True
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def __call__(self, request):
+        by_token = self.by_token(request)
+        if not by_token and (
+                random.random() >= settings.REQUEST_TIMING_SAMPLE_RATE):
+            started = time.perf_counter()
+            response = self.get_response(request)
+            total = time.perf_counter() - started
+            if total * 1000 >= settings.REQUEST_TIMING_SLOW_MS:
+                logger.warning(json.dumps({
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'total_ms': round(total * 1000, 1),
+                    'sampled': False,
+                }, ensure_ascii=False))
+            return response
+        timing = RequestTiming()
+        reset = current.set(timing)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.execute))
+                response = self.get_response(request)
+        finally:
+            current.reset(reset)
+        total = time.perf_counter() - timing.started
+        if self.exposed(request, by_token):
+            response['Server-Timing'] = timing.server_timing(total)
+        record = timing.record(request, response, total)
+        slow = total * 1000 >= settings.REQUEST_TIMING_SLOW_MS
+        logger.log(
+            logging.WARNING if slow or record['duplicates'] else logging.INFO,
+            json.dumps(record, ensure_ascii=False))
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Включает чтение с реплик и закрепляет primary после записи.
+
+    GET и HEAD читают с реплик, если у клиента нет cookie закрепления.
+    Запрос, который что-то записал (пост, комментарий, подписка, вход),
+    ставит cookie на REPLICA_PIN_SECONDS: этого хватает, чтобы реплики
+    догнали primary, и клиент видит свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = settings.REPLICA_PIN_COOKIE in request.COOKIES
+        state = routers.ReplicaState(
+            readonly=request.method in ('GET', 'HEAD') and not pinned)
+        reset = routers.current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.current.reset(reset)
+        if state.wrote and settings.REPLICA_DATABASES:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                samesite='Lax')
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, который берёт пользователя из кеша.
+
+    С кешированными сессиями (SESSION_ENGINE cached_db) вошедший
+    пользователь не стоит запросов к базе, а гость без cookie сессии
+    не читает и саму сессию.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: auth.get_user(request))
@@ -0,0 +1,41 @@
+import os
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+
+def template_names(engine):
+    """Шаблоны проекта: файлы каталогов движка, лежащие внутри BASE_DIR.
+
+    Шаблоны сторонних приложений (admin и т. п.) не трогаются — их
+    разбор удлинил бы запуск, а ошибок в них мы не исправим.
+    """
+    for directory in engine.template_dirs:
+        directory = os.path.abspath(directory)
+        if not directory.startswith(settings.BASE_DIR):
+            continue
+        for root, _, files in os.walk(directory):
+            for file in sorted(files):
+                if file.endswith('.html'):
+                    yield os.path.relpath(
+                        os.path.join(root, file), directory).replace(
+                            os.sep, '/')
+
+
+def compile_templates():
+    """Разбирает все шаблоны проекта, возвращает (число, ошибки).
+
+    С кешированным загрузчиком Django и в кеше окружения Jinja2
+    разобранные шаблоны остаются в памяти процесса, и первый запрос
+    не платит за чтение и разбор файлов.
+    """
+    compiled, errors = 0, []
+    for engine in engines.all():
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateSyntaxError, TemplateDoesNotExist) as error:
+                errors.append((name, error))
+            else:
+                compiled += 1
+    return compiled, errors
@@ -0,0 +1,56 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+# Состояние текущего запроса; вне запроса (потоки, команды) его нет.
+current = ContextVar('replica_state', default=None)
+
+
+class ReplicaState:
+    def __init__(self, readonly):
+        # Запрос может читать с реплик: безопасный метод и нет закрепления.
+        self.readonly = readonly
+        self.wrote = False
+
+
+def read_primary():
+    """Дочитывает текущий запрос из primary, как после записи."""
+    state = current.get()
+    if state is not None:
+        state.readonly = False
+
+
+class ReplicaRouter:
+    """Чтение в GET-запросах — с реплик, запись и всё остальное — в primary.
+
+    Реплики перечислены в REPLICA_DATABASES. После первой записи запрос
+    дочитывает из primary, а ReplicaPinMiddleware закрепляет за клиентом
+    primary на REPLICA_PIN_SECONDS, чтобы он видел свои изменения.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = current.get()
+        replicas = settings.REPLICA_DATABASES
+        if not replicas or state is None or not state.readonly or state.wrote:
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = current.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {PRIMARY, *settings.REPLICA_DATABASES}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .auth import user_cache_key
+
+# Замеры для RequestTimingMiddleware; без подписчиков send() почти
+# ничего не стоит.
+# duration — секунды внешнего рендера шаблона.
+template_rendered = Signal()
+# hits, misses — итог чтения из кеша.
+cache_read = Signal()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    """Смена пароля, профиля или last_login сбрасывает кеш пользователя."""
+    cache.delete(user_cache_key(instance.pk))
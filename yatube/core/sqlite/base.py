@@ -0,0 +1,83 @@
+import threading
+
+from django.db.backends.sqlite3 import base
+
+# Очередь писателей процесса: по замку на файл базы.
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def writer_lock(name):
+    with _writers_lock:
+        return _writers.setdefault(name, threading.Lock())
+
+
+def apply_pragmas(connection, pragmas):
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с прагмами на каждом соединении и очередью писателей.
+
+    OPTIONS['pragmas'] выполняются при открытии соединения (WAL,
+    synchronous, mmap_size и т. п.). С OPTIONS['immediate'] транзакции
+    atomic начинаются с BEGIN IMMEDIATE, а потоки процесса ждут запись
+    по очереди на замке. Иначе транзакция, начавшая с чтения, падает
+    с «database is locked» при попытке записи, а busy_timeout её не
+    спасает. Другие процессы ждут в busy_timeout (OPTIONS['timeout']).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = options.get('pragmas', {})
+        self.immediate = options.get('immediate', False)
+        self.holds_writer = False
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('immediate', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        if not self.is_in_memory_db():
+            apply_pragmas(connection, self.pragmas)
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        if not self.immediate:
+            return super()._start_transaction_under_autocommit()
+        timeout = self.settings_dict['OPTIONS'].get('timeout', 5)
+        self.holds_writer = writer_lock(self.settings_dict['NAME']).acquire(
+            timeout=timeout)
+        try:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        except Exception:
+            self.release_writer()
+            raise
+
+    def release_writer(self):
+        if self.holds_writer:
+            self.holds_writer = False
+            writer_lock(self.settings_dict['NAME']).release()
+
+    def _commit(self):
+        try:
+            super()._commit()
+        finally:
+            self.release_writer()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self.release_writer()
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            self.release_writer()
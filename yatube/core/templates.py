@@ -0,0 +1,62 @@
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.template.backends import django as django_backend
+
+from .signals import template_rendered
+
+try:
+    from django.template.backends import jinja2 as jinja2_backend
+except ImportError:
+    jinja2_backend = None
+
+# Внутренний рендер (карточки внутри ленты) уже входит во внешний.
+_rendering = ContextVar('template_rendering', default=False)
+
+
+def timed(render):
+    """render, сообщающий template_rendered время внешнего рендера."""
+    @wraps(render)
+    def wrapper(self, *args, **kwargs):
+        if _rendering.get():
+            return render(self, *args, **kwargs)
+        reset = _rendering.set(True)
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            _rendering.reset(reset)
+            template_rendered.send(
+                sender=type(self), duration=time.perf_counter() - started)
+    return wrapper
+
+
+class DjangoTemplate(django_backend.Template):
+    render = timed(django_backend.Template.render)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Шаблоны Django, сообщающие время рендера сигналом."""
+
+    def from_string(self, template_code):
+        return DjangoTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return DjangoTemplate(
+            super().get_template(template_name).template, self)
+
+
+if jinja2_backend is not None:
+    class Jinja2Template(jinja2_backend.Template):
+        render = timed(jinja2_backend.Template.render)
+
+    class Jinja2(jinja2_backend.Jinja2):
+        """Шаблоны Jinja2, сообщающие время рендера сигналом."""
+
+        def from_string(self, template_code):
+            return Jinja2Template(self.env.from_string(template_code), self)
+
+        def get_template(self, template_name):
+            return Jinja2Template(
+                super().get_template(template_name).template, self)
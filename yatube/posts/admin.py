@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.contrib import admin
 
+from . import search
 from .models import Group, Post
 
 
@@ -17,6 +18,13 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        hits = search.backend().search(
+            search_term, limit=settings.SEARCH_ADMIN_LIMIT)
+        return queryset.filter(pk__in=[pk for pk, _ in hits]), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
@@ -24,6 +32,7 @@ class GroupAdmin(admin.ModelAdmin):
         'title',
         'slug',
         'description',
+        'posts_count',
     )
     search_fields = ('title',)
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
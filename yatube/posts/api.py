@@ -0,0 +1,350 @@
+"""JSON API для лент, постов, комментариев и подписок.
+
+Строки строятся через values() с проекцией только запрошенных полей
+(?fields=), без создания моделей. Ленты листаются курсорами
+KeysetPaginator, ответы на чтение получают ETag по версиям лент.
+"""
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, JsonResponse, QueryDict
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods
+
+from .cache import feed_condition
+from .follows import follow_many, unfollow_many
+from .forms import CommentForm, PostForm
+from .models import Comment, Follow, Group, Post, User
+from .timeline import timeline_entries
+from .uploads import image_uploads
+from .utils import KeysetPaginator
+from .views import group_feeds, post_feeds, profile_feeds
+
+# Поле ответа -> путь в values().
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'thumbnail': 'thumbnail',
+    'comments_count': 'comments_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'parent': 'parent_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+GROUP_FIELDS = {
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+    'posts_count': 'posts_count',
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def api_view(*methods):
+    """Разрешённые методы и ошибки в виде JSON вместо HTML-страниц."""
+    def decorator(view):
+        @require_http_methods(methods)
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return view(request, *args, **kwargs)
+            except Http404:
+                return JsonResponse({'detail': 'Не найдено.'}, status=404)
+            except ApiError as error:
+                return JsonResponse({'detail': error.detail},
+                                    status=error.status)
+        return wrapper
+    return decorator
+
+
+def require_user(request):
+    if not request.user.is_authenticated:
+        raise ApiError(401, 'Нужна авторизация.')
+
+
+def payload(request):
+    """Тело запроса: JSON или форма.
+
+    request.POST Django заполняет только для POST, поэтому форму
+    PATCH разбираем сами; multipart принимается только в POST.
+    """
+    if request.content_type != 'application/json':
+        if request.method == 'POST':
+            return request.POST
+        if request.content_type != 'application/x-www-form-urlencoded':
+            raise ApiError(415, 'Ожидался JSON или '
+                                'application/x-www-form-urlencoded.')
+        return QueryDict(request.body, encoding=request.encoding)
+    try:
+        data = json.loads(request.body or '{}')
+    except ValueError:
+        raise ApiError(400, 'Некорректный JSON.')
+    if not isinstance(data, dict):
+        raise ApiError(400, 'Ожидался JSON-объект.')
+    return data
+
+
+def selected(request, fields):
+    """Поля из ?fields=a,b в порядке схемы; без параметра — все."""
+    names = request.GET.get('fields')
+    if not names:
+        return fields
+    names = set(names.split(','))
+    unknown = names - set(fields)
+    if unknown:
+        raise ApiError(
+            400, f'Неизвестные поля: {", ".join(sorted(unknown))}.')
+    return {name: path for name, path in fields.items() if name in names}
+
+
+def project(queryset, fields, prefix='', extra=()):
+    """values() только по нужным колонкам; prefix — путь до модели."""
+    return queryset.values(
+        *extra, *(prefix + path for path in fields.values()))
+
+
+def serialize(row, fields, prefix=''):
+    data = {name: row[prefix + path] for name, path in fields.items()}
+    for name in ('image', 'thumbnail'):
+        if name in data:
+            data[name] = data[name] or None
+    if data.get('image'):
+        data['image'] = default_storage.url(data['image'])
+    return data
+
+
+def limit(request):
+    try:
+        value = int(request.GET.get('limit', settings.POST_LIST))
+    except ValueError:
+        raise ApiError(400, 'limit должен быть числом.')
+    return max(1, min(value, settings.API_MAX_LIMIT))
+
+
+def page_response(request, rows, fields, prefix='', date_field='pub_date'):
+    page = KeysetPaginator(rows, limit(request), date_field).get_cursor_page(
+        request.GET.get('cursor'))
+    return JsonResponse({
+        'results': [serialize(row, fields, prefix) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+def posts_page(request, queryset):
+    fields = selected(request, POST_FIELDS)
+    return page_response(
+        request, project(queryset, fields, extra=('id', 'pub_date')), fields)
+
+
+def post_form(request, post=None):
+    data = payload(request)
+    if post is not None:
+        if isinstance(data, QueryDict):
+            data = data.dict()
+        data = {'text': post.text, 'group': post.group_id, **data}
+    form = PostForm(data, files=request.FILES or None, instance=post)
+    if not form.is_valid():
+        return None, JsonResponse({'errors': form.errors}, status=400)
+    return form, None
+
+
+def post_json(request, post_id, status=200):
+    fields = selected(request, POST_FIELDS)
+    row = project(Post.objects.filter(pk=post_id), fields).first()
+    if row is None:
+        raise Http404
+    return JsonResponse(serialize(row, fields), status=status)
+
+
+@feed_condition(lambda request: ['index'])
+def index_feed(request):
+    return posts_page(request, Post.objects.all())
+
+
+def create_post(request):
+    require_user(request)
+    form, errors = post_form(request)
+    if errors:
+        return errors
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    return post_json(request, post.pk, status=201)
+
+
+@image_uploads
+@api_view('GET', 'POST')
+def posts(request):
+    if request.method == 'POST':
+        return create_post(request)
+    return index_feed(request)
+
+
+@api_view('GET')
+def posts_batch(request):
+    """Посты по ?ids=1,2,3 одним запросом, в порядке запроса."""
+    try:
+        ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk]
+    except ValueError:
+        raise ApiError(400, 'ids должен быть списком чисел.')
+    if len(ids) > settings.API_BATCH_LIMIT:
+        raise ApiError(
+            400, f'Не больше {settings.API_BATCH_LIMIT} постов за запрос.')
+    fields = selected(request, POST_FIELDS)
+    rows = {row['id']: row for row in project(
+        Post.objects.filter(pk__in=ids), fields, extra=('id',))}
+    return JsonResponse({'results': [
+        serialize(rows[pk], fields) for pk in dict.fromkeys(ids)
+        if pk in rows]})
+
+
+@feed_condition(post_feeds)
+def post_read(request, post_id):
+    return post_json(request, post_id)
+
+
+@image_uploads
+@api_view('GET', 'PATCH', 'DELETE')
+def post(request, post_id):
+    if request.method == 'GET':
+        return post_read(request, post_id=post_id)
+    require_user(request)
+    instance = get_object_or_404(Post, pk=post_id)
+    if instance.author_id != request.user.pk:
+        raise ApiError(403, 'Изменять пост может только автор.')
+    if request.method == 'DELETE':
+        instance.delete()
+        return HttpResponse(status=204)
+    form, errors = post_form(request, instance)
+    if errors:
+        return errors
+    form.save()
+    return post_json(request, post_id)
+
+
+@feed_condition(post_feeds)
+def comments_page(request, post_id):
+    get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    fields = selected(request, COMMENT_FIELDS)
+    rows = project(Comment.objects.filter(post_id=post_id), fields,
+                   extra=('id', 'created'))
+    return page_response(request, rows, fields, date_field='created')
+
+
+@api_view('GET', 'POST')
+def comments(request, post_id):
+    if request.method == 'GET':
+        return comments_page(request, post_id=post_id)
+    require_user(request)
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
+    form = CommentForm(payload(request), post=post)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post_id = post_id
+    comment.save()
+    fields = selected(request, COMMENT_FIELDS)
+    row = project(Comment.objects.filter(pk=comment.pk), fields).get()
+    return JsonResponse(serialize(row, fields), status=201)
+
+
+@api_view('GET')
+def groups(request):
+    fields = selected(request, GROUP_FIELDS)
+    rows = project(Group.objects.order_by('title'), fields)
+    return JsonResponse(
+        {'results': [serialize(row, fields) for row in rows]})
+
+
+@api_view('GET')
+def group(request, slug):
+    fields = selected(request, GROUP_FIELDS)
+    row = project(Group.objects.filter(slug=slug), fields).first()
+    if row is None:
+        raise Http404
+    return JsonResponse(serialize(row, fields))
+
+
+@api_view('GET')
+@feed_condition(group_feeds)
+def group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only('pk'), slug=slug)
+    return posts_page(request, Post.objects.filter(group=group))
+
+
+@api_view('GET')
+@feed_condition(profile_feeds)
+def user_posts(request, username):
+    author = get_object_or_404(User.objects.only('pk'), username=username)
+    return posts_page(request, Post.objects.filter(author=author))
+
+
+def follow_feeds(request):
+    if not request.user.is_authenticated:
+        return None
+    return ['index', f'follow:{request.user.pk}']
+
+
+@api_view('GET')
+@feed_condition(follow_feeds)
+def follow_feed(request):
+    require_user(request)
+    fields = selected(request, POST_FIELDS)
+    rows, prefix = timeline_entries(request.user)
+    rows = project(rows, fields, prefix=prefix, extra=('id', 'pub_date'))
+    return page_response(request, rows, fields, prefix=prefix)
+
+
+def usernames(request):
+    """Имена из {"authors": [...]} или {"author": "..."}."""
+    data = payload(request)
+    names = [data['author']] if 'author' in data else data.get('authors')
+    if not isinstance(names, list) or not all(
+            isinstance(name, str) for name in names):
+        raise ApiError(400, 'authors должен быть списком имён.')
+    if len(names) > settings.API_BATCH_LIMIT:
+        raise ApiError(
+            400, f'Не больше {settings.API_BATCH_LIMIT} имён за запрос.')
+    return names
+
+
+@api_view('GET', 'POST', 'DELETE')
+def follows(request):
+    require_user(request)
+    if request.method == 'POST':
+        followed, missing = follow_many(request.user, usernames(request))
+        return JsonResponse({'followed': followed, 'missing': missing},
+                            status=201 if followed else 200)
+    if request.method == 'DELETE':
+        return JsonResponse(
+            {'unfollowed': unfollow_many(request.user, usernames(request))})
+    authors = Follow.objects.filter(user=request.user).order_by(
+        'author__username').values_list('author__username', flat=True)
+    return JsonResponse({'results': list(authors)})
+
+
+@api_view('DELETE')
+def follow(request, username):
+    require_user(request)
+    follow = get_object_or_404(
+        Follow, user=request.user, author__username=username)
+    follow.delete()
+    return HttpResponse(status=204)
@@ -0,0 +1,259 @@
+import copy
+import random
+import re
+import statistics
+import time
+from collections import namedtuple
+from datetime import timedelta
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+
+from . import counters, search, timeline
+from .models import Comment, Follow, Group, Post, User
+from .utils import keep_timestamps
+
+Route = namedtuple('Route', ('method', 'url', 'user', 'setup'),
+                   defaults=(None, lambda: None))
+
+# Заголовок X-Request-Timing, включающий замер шаблонов в Server-Timing.
+TIMING_TOKEN = 'benchmark'
+TEMPLATE_TIME = re.compile(r'tpl;dur=([\d.]+)')
+
+# View лент с шаблонами на обоих движках и их адреса в routes().
+FEED_VIEWS = ('index', 'group_posts', 'profile', 'follow_index')
+FEED_ROUTES = ('index', 'index_page_5', 'group_list', 'profile',
+               'follow_index')
+
+DUMMY_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+SCALE = {
+    'users': 200,
+    'groups': 20,
+    'posts': 5000,
+    'comments': 10000,
+    'follows': 20,
+}
+
+
+def seed(users, groups, posts, comments, follows, seed=0):
+    """Заполняет базу синтетическими данными заданного масштаба."""
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    rnd = random.Random(seed)
+    password = make_password('benchmark')
+    User.objects.bulk_create(
+        (User(username=f'user{i}', first_name=fake.first_name(),
+              last_name=fake.last_name(), password=password)
+         for i in range(users)))
+    Group.objects.bulk_create(
+        (Group(title=fake.sentence(nb_words=3), slug=f'group{i}',
+               description=fake.text())
+         for i in range(groups)))
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    group_ids = list(Group.objects.values_list('pk', flat=True)) + [None]
+    now = timezone.now()
+    with keep_timestamps():
+        Post.objects.bulk_create(
+            (Post(text=fake.text(), author_id=rnd.choice(user_ids),
+                  group_id=rnd.choice(group_ids),
+                  pub_date=now - timedelta(minutes=i))
+             for i in range(posts)))
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        Comment.objects.bulk_create(
+            (Comment(text=fake.sentence(), post_id=rnd.choice(post_ids),
+                     author_id=rnd.choice(user_ids),
+                     created=now - timedelta(seconds=i))
+             for i in range(comments)))
+    Follow.objects.bulk_create(
+        (Follow(user_id=user_id, author_id=author_id)
+         for user_id in user_ids
+         for author_id in rnd.sample(user_ids, min(follows, len(user_ids)))
+         if author_id != user_id),
+        ignore_conflicts=True)
+    counters.reconcile()
+    search.backend().rebuild()
+    for user_id, author_id in Follow.objects.values_list(
+            'user_id', 'author_id').iterator():
+        timeline.backfill(user_id, author_id)
+
+
+def pick(queryset, rnd):
+    pks = list(queryset.values_list('pk', flat=True))
+    return queryset.get(pk=rnd.choice(pks))
+
+
+def routes(seed=0):
+    """Все адреса posts.urls по имени: метод, url, пользователь, подготовка.
+
+    Подготовка выполняется перед каждым запросом вне замера, чтобы
+    подписка и отписка каждый раз меняли состояние, а не упирались в него.
+    """
+    rnd = random.Random(seed)
+    post = pick(Post.objects.select_related('author'), rnd)
+    group = pick(Group.objects.all(), rnd)
+    reader = pick(User.objects.filter(follower__isnull=False).distinct(), rnd)
+    author = pick(User.objects.exclude(pk=reader.pk), rnd)
+    follow = Follow.objects.filter(user=reader, author=author)
+    post_kwargs = {'post_id': post.pk}
+    author_kwargs = {'username': author.username}
+    return {
+        'index': Route('get', reverse('posts:index')),
+        'index_page_5': Route('get', reverse('posts:index') + '?page=5'),
+        'search': Route('get', reverse('posts:search') + '?q=' + quote(
+            post.text.split()[0])),
+        'group_list': Route('get', reverse(
+            'posts:group_list', kwargs={'slug': group.slug})),
+        'profile': Route('get', reverse(
+            'posts:profile', kwargs=author_kwargs)),
+        'post_detail': Route('get', reverse(
+            'posts:post_detail', kwargs=post_kwargs)),
+        'post_create': Route('get', reverse('posts:post_create'), reader),
+        'post_edit': Route('get', reverse(
+            'posts:post_edit', kwargs=post_kwargs), post.author),
+        'add_comment': Route('post', reverse(
+            'posts:add_comment', kwargs=post_kwargs), reader),
+        'follow_index': Route('get', reverse('posts:follow_index'), reader),
+        'profile_follow': Route('get', reverse(
+            'posts:profile_follow', kwargs=author_kwargs), reader,
+            lambda: follow.delete()),
+        'profile_unfollow': Route('get', reverse(
+            'posts:profile_unfollow', kwargs=author_kwargs), reader,
+            lambda: Follow.objects.get_or_create(user=reader, author=author)),
+    }
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def measure(route, requests, cold=False):
+    """Гоняет один адрес и считает задержки, запросы к БД и байты.
+
+    Время рендера шаблонов (tpl_ms) берётся из Server-Timing, если
+    замер запроса включён (см. compare_loaders).
+    """
+    client = Client(HTTP_X_REQUEST_TIMING=TIMING_TOKEN)
+    if route.user is not None:
+        client.force_login(route.user)
+    send = getattr(client, route.method)
+    data = {'text': 'Комментарий для замера'} if route.method == 'post' else {}
+    timings, queries, sizes, templates = [], [], [], []
+    for attempt in range(requests + 1):
+        route.setup()
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send(route.url, data)
+            elapsed = time.perf_counter() - started
+        if attempt == 0:
+            # Первый запрос прогревает кеши и не попадает в статистику.
+            continue
+        timings.append(elapsed)
+        queries.append(len(captured))
+        sizes.append(len(response.content))
+        template = TEMPLATE_TIME.search(response.get('Server-Timing', ''))
+        templates.append(float(template.group(1)) if template else 0.0)
+    return {
+        'status': response.status_code,
+        'requests': requests,
+        'rps': round(requests / sum(timings), 1),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 2),
+        'queries': round(statistics.mean(queries), 2),
+        'bytes': round(statistics.mean(sizes)),
+        'tpl_ms': round(percentile(templates, 0.50), 2),
+    }
+
+
+def run(requests, cold=False, only=None, seed=0):
+    """Замеряет адреса posts.urls, по умолчанию все."""
+    return {
+        name: measure(route, requests, cold)
+        for name, route in routes(seed).items()
+        if not only or name in only
+    }
+
+
+def template_settings(cached):
+    """TEMPLATES из настроек с кешированным загрузчиком или без него.
+
+    Для Jinja2 то же самое — проверка файлов на изменения (auto_reload).
+    """
+    templates = copy.deepcopy(settings.TEMPLATES)
+    loaders = settings.TEMPLATE_LOADERS
+    for engine in templates:
+        if engine['BACKEND'].endswith('.DjangoTemplates'):
+            engine['OPTIONS']['loaders'] = (
+                [('django.template.loaders.cached.Loader', loaders)]
+                if cached else loaders)
+        else:
+            engine['OPTIONS']['auto_reload'] = not cached
+    return templates
+
+
+def compare_loaders(requests, only=None, seed=0):
+    """Рендер каждого адреса без кеша шаблонов и с ним.
+
+    Кеш данных очищается перед каждым запросом: иначе гость получает
+    страницу из кеша страниц, и шаблоны не рендерятся вовсе.
+    """
+    results = {}
+    for label, cached in (('plain', False), ('cached', True)):
+        with override_settings(TEMPLATES=template_settings(cached),
+                               REQUEST_TIMING_TOKEN=TIMING_TOKEN):
+            results[label] = run(requests, cold=True, only=only, seed=seed)
+    return results
+
+
+def compare_engines(requests, only=None, seed=0):
+    """Рендер лент шаблонами Django и Jinja2, оба с кешем шаблонов.
+
+    Кеш данных подменяется заглушкой: каждая страница и карточка
+    рендерится заново, а запись фрагментов в кеш не смешивается
+    со временем шаблонов.
+    """
+    results = {}
+    for engine in ('django', 'jinja2'):
+        engines = {} if engine == 'django' else dict.fromkeys(
+            FEED_VIEWS, engine)
+        with override_settings(TEMPLATES=template_settings(cached=True),
+                               FEED_TEMPLATE_ENGINES=engines,
+                               CACHES=DUMMY_CACHES,
+                               REQUEST_TIMING_TOKEN=TIMING_TOKEN):
+            results[engine] = run(requests, only=only or FEED_ROUTES,
+                                  seed=seed)
+    return results
+
+
+def compare(old, new, threshold):
+    """Строки отчёта о регрессиях между двумя прогонами."""
+    lines = []
+    for name, metrics in new.items():
+        before = old.get(name)
+        if before is None:
+            continue
+        for key, worse_if_higher in (('p95_ms', True), ('rps', False),
+                                     ('queries', True), ('bytes', True)):
+            if not before[key]:
+                continue
+            change = (metrics[key] - before[key]) / before[key]
+            regression = change > threshold if worse_if_higher else (
+                change < -threshold)
+            if regression:
+                lines.append(f'{name}.{key}: {before[key]} -> '
+                             f'{metrics[key]} ({change:+.0%})')
+    return lines
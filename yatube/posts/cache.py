@@ -0,0 +1,122 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from core import routers
+
+from .edge import schedule_purge
+
+VERSION_KEY = 'feed:version:{}'
+ALL_FEEDS = 'all'
+
+
+def feed_names(post):
+    """Ленты, в которых показывается пост."""
+    names = ['index', f'profile:{post.author_id}']
+    if post.group_id:
+        names.append(f'group:{post.group_id}')
+    return names
+
+
+def bump_feeds(*names):
+    """Сбрасывает ленты, выдавая им новые версии ключей.
+
+    Страницы с этими лентами выбрасываются и из кеша обратного прокси.
+    """
+    version = time.time_ns()
+    cache.set_many(
+        {VERSION_KEY.format(name): version for name in names}, None)
+    schedule_purge(names)
+
+
+def feed_versions(*names):
+    """Версии лент (ALL_FEEDS первой); недостающие заводятся сейчас."""
+    keys = [VERSION_KEY.format(name) for name in (ALL_FEEDS, *names)]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        # add(): параллельный запрос мог завести версию раньше, и
+        # фрагменты обоих должны лечь под одну и ту же.
+        lost = [key for key, version in missing.items()
+                if not cache.add(key, version, None)]
+        versions.update(missing)
+        if lost:
+            versions.update(cache.get_many(lost))
+    return [versions[key] for key in keys]
+
+
+def feed_page(request):
+    return request.GET.get('page') or request.GET.get('cursor') or ''
+
+
+def feed_cache_context(request, *names):
+    """Ключ и таймаут для {% cache %} ленты с учётом версии и страницы."""
+    versions = feed_versions(*names)
+    return {
+        'feed_cache_key': ':'.join(
+            [*names, *map(str, versions), feed_page(request)]),
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
+    }
+
+
+def request_versions(request, names_func, kwargs):
+    """Версии лент страницы, посчитанные один раз на запрос.
+
+    Если лента сброшена позже REPLICA_PIN_SECONDS назад, реплики могли
+    ещё не получить запись: страница читается из primary, иначе старые
+    данные легли бы в кеш страниц и фрагментов под новой версией.
+    """
+    if not hasattr(request, '_feed_versions'):
+        names = names_func(request, **kwargs)
+        if names is not None and request.user.is_authenticated:
+            names = [*names, f'follow:{request.user.pk}']
+        request._feed_names = names
+        request._feed_versions = (
+            None if names is None else feed_versions(*names))
+        settled = time.time_ns() - settings.REPLICA_PIN_SECONDS * 10 ** 9
+        if names is not None and max(request._feed_versions) > settled:
+            routers.read_primary()
+    return request._feed_versions
+
+
+def feed_condition(names_func):
+    """Отвечает 304 по версиям лент, не трогая queryset и шаблон.
+
+    names_func(request, **kwargs) возвращает имена лент страницы или None,
+    если объекта нет — тогда view отработает как обычно. Версия — это
+    time_ns() последнего сброса, она же служит Last-Modified. Зритель
+    входит в ETag и в список лент: шапка и подписки у каждого свои.
+    В ETag входит и CSRF-токен: после входа токен новый, и формы
+    страницы из кеша браузера не должны нести старый.
+    """
+    def etag(request, *args, **kwargs):
+        stamps = request_versions(request, names_func, kwargs)
+        if stamps is None:
+            return None
+        raw = ':'.join([*map(str, stamps), str(request.user.pk),
+                        request.META.get('CSRF_COOKIE', ''),
+                        request.get_full_path()])
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        stamps = request_versions(request, names_func, kwargs)
+        if stamps is None:
+            return None
+        return datetime.fromtimestamp(max(stamps) / 1e9, timezone.utc)
+
+    def decorator(view):
+        conditional = condition(etag, last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            if response.has_header('ETag'):
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
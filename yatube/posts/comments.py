@@ -0,0 +1,35 @@
+from collections import defaultdict
+
+from django.conf import settings
+
+from .models import Comment
+from .utils import KeysetPaginator
+
+COMMENT_FIELDS = ('text', 'created', 'path', 'parent', 'author__username')
+
+
+def thread_page(post, request):
+    """Страница веток комментариев: два запроса при любом их числе.
+
+    Комментарии к посту листаются курсором по (created, id), ответы
+    всех веток страницы приходят одним запросом по path. У каждого
+    комментария страницы в thread — ответы в порядке обхода дерева.
+    """
+    roots = Comment.objects.filter(post=post, parent=None).select_related(
+        'author').only(*COMMENT_FIELDS)
+    page = KeysetPaginator(
+        roots, settings.COMMENT_LIST, 'created').get_cursor_page(
+            request.GET.get('cursor'))
+    replies = defaultdict(list)
+    for reply in Comment.objects.subtrees(page).select_related(
+            'author').only(*COMMENT_FIELDS).order_by('path', 'id'):
+        replies[reply.parent_id].append(reply)
+
+    def walk(comment):
+        for reply in replies[comment.pk]:
+            yield reply
+            yield from walk(reply)
+
+    for root in page:
+        root.thread = list(walk(root))
+    return page
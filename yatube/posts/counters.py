@@ -0,0 +1,90 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+def _shift(queryset, field, delta):
+    """Сдвигает счётчик одним UPDATE, не опуская его ниже нуля."""
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def _create_stats(author_id):
+    """Заводит счётчики автора, посчитав их по таблицам."""
+    AuthorStats.objects.get_or_create(user_id=author_id, defaults={
+        'posts_count': Post.objects.filter(author_id=author_id).count(),
+        'followers_count': Follow.objects.filter(
+            author_id=author_id).count(),
+    })
+
+
+def change_author_posts(author_id, delta):
+    updated = _shift(
+        AuthorStats.objects.filter(user_id=author_id), 'posts_count', delta)
+    if not updated and delta > 0:
+        _create_stats(author_id)
+
+
+def change_author_followers(author_ids, delta):
+    """Сдвигает счётчик подписчиков сразу у нескольких авторов."""
+    updated = _shift(AuthorStats.objects.filter(user_id__in=author_ids),
+                     'followers_count', delta)
+    if updated < len(author_ids) and delta > 0:
+        for author_id in author_ids:
+            _create_stats(author_id)
+
+
+def change_group_posts(group_id, delta):
+    if group_id is not None:
+        _shift(Group.objects.filter(pk=group_id), 'posts_count', delta)
+
+
+def change_post_comments(post_id, delta):
+    if post_id is not None:
+        _shift(Post.objects.filter(pk=post_id), 'comments_count', delta)
+
+
+def author_posts_count(user):
+    try:
+        return user.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def _count(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by()
+        .values(field).annotate(total=Count('pk')).values('total')), 0)
+
+
+def reconcile():
+    """Пересчитывает все счётчики пакетными UPDATE.
+
+    Возвращает число исправленных строк по каждому счётчику.
+    """
+    AuthorStats.objects.bulk_create(
+        (AuthorStats(user_id=pk) for pk in User.objects.filter(
+            stats__isnull=True).values_list('pk', flat=True).iterator()),
+        batch_size=1000, ignore_conflicts=True)
+    author_posts = Coalesce(Subquery(
+        Post.objects.filter(author_id=OuterRef('user_id')).order_by()
+        .values('author_id').annotate(total=Count('pk')).values('total')), 0)
+    author_followers = Coalesce(Subquery(
+        Follow.objects.filter(author_id=OuterRef('user_id')).order_by()
+        .values('author_id').annotate(total=Count('pk')).values('total')), 0)
+    group_posts = _count(Post, 'group')
+    post_comments = _count(Comment, 'post')
+    return {
+        'authors': AuthorStats.objects.exclude(
+            posts_count=author_posts).update(posts_count=author_posts),
+        'followers': AuthorStats.objects.exclude(
+            followers_count=author_followers).update(
+            followers_count=author_followers),
+        'groups': Group.objects.exclude(
+            posts_count=group_posts).update(posts_count=group_posts),
+        'posts': Post.objects.exclude(
+            comments_count=post_comments).update(
+            comments_count=post_comments),
+    }
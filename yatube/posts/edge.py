@@ -0,0 +1,38 @@
+import logging
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def surrogate_key(names):
+    """Значение Surrogate-Key: имена лент через пробел."""
+    return ' '.join(names)
+
+
+def purge(names):
+    """Просит обратный прокси выбросить страницы с этими лентами.
+
+    Запрос уходит на EDGE_PURGE_URL с заголовком Surrogate-Key (так
+    чистят по ключу Fastly и Varnish с xkey). Ошибка прокси не ломает
+    запись: страница устареет самое позднее через EDGE_CACHE_TIMEOUT.
+    """
+    request = Request(settings.EDGE_PURGE_URL, method='POST', headers={
+        'Surrogate-Key': surrogate_key(names),
+        **settings.EDGE_PURGE_HEADERS,
+    })
+    try:
+        with urlopen(request, timeout=settings.EDGE_PURGE_TIMEOUT):
+            pass
+    except OSError as error:
+        logger.warning('Не удалось сбросить ключи %s на прокси: %s',
+                       surrogate_key(names), error)
+
+
+def schedule_purge(names):
+    """Сброс на прокси после коммита, чтобы он не забрал старые данные."""
+    if settings.EDGE_PURGE_URL:
+        names = list(names)
+        transaction.on_commit(lambda: purge(names))
@@ -0,0 +1,67 @@
+from contextvars import ContextVar
+
+from django.db import router
+
+from . import counters, timeline
+from .cache import bump_feeds
+from .models import Follow, User
+
+# Пакетная операция сама обновляет ленты и счётчики; сигналы подписок
+# на время пакета ничего не делают.
+batch = ContextVar('follow_batch', default=False)
+
+
+def author_ids(usernames):
+    """id авторов по именам одним запросом IN; неизвестные пропускаются."""
+    return dict(User.objects.filter(username__in=set(usernames)).values_list(
+        'username', 'pk'))
+
+
+def follow_many(user, usernames):
+    """Подписывает на авторов пакетно.
+
+    Возвращает имена новых подписок и имена, которых нет среди
+    пользователей.
+
+    bulk_create обходит post_save, поэтому ленту подписок, счётчики
+    подписчиков и версию follow:<id> обновляем здесь сами, один раз на
+    пакет.
+    """
+    authors = author_ids(usernames)
+    missing = sorted(set(usernames) - set(authors))
+    authors.pop(user.username, None)
+    existing = set(Follow.objects.filter(
+        user=user, author_id__in=authors.values()).values_list(
+        'author_id', flat=True))
+    new = {name: pk for name, pk in authors.items() if pk not in existing}
+    if new:
+        Follow.objects.bulk_create(
+            (Follow(user=user, author_id=pk) for pk in new.values()),
+            ignore_conflicts=True)
+        counters.change_author_followers(list(new.values()), 1)
+        timeline.backfill(user.pk, *new.values())
+        bump_feeds(f'follow:{user.pk}')
+    return sorted(new), missing
+
+
+def unfollow_many(user, usernames):
+    """Отписывает от авторов одним delete(); возвращает снятые подписки.
+
+    Подписки читаются и удаляются на базе для записи. post_delete
+    приходит на каждую строку, но ленту, счётчики и версию follow:<id>
+    обновляем здесь один раз на пакет.
+    """
+    follows = Follow.objects.db_manager(router.db_for_write(Follow)).filter(
+        user=user, author__username__in=set(usernames))
+    removed = dict(follows.values_list('author__username', 'author_id'))
+    if removed:
+        reset = batch.set(True)
+        try:
+            follows.filter(author_id__in=removed.values()).delete()
+        finally:
+            batch.reset(reset)
+        counters.change_author_followers(list(removed.values()), -1)
+        timeline.leave_pull(removed.values())
+        timeline.remove(user.pk, *removed.values())
+        bump_feeds(f'follow:{user.pk}')
+    return sorted(removed)
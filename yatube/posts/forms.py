@@ -1,6 +1,9 @@
 from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 
 from .models import Comment, Post
+from .uploads import check_dimensions, size_error
 
 
 class PostForm(forms.ModelForm):
@@ -8,8 +11,50 @@ class PostForm(forms.ModelForm):
         model = Post
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        image = self.files.get('image')
+        self.upload_error = getattr(image, 'upload_error', None)
+        if self.upload_error:
+            self.files = self.files.copy()
+            del self.files['image']
+
+    def clean_image(self):
+        if self.upload_error:
+            raise forms.ValidationError(self.upload_error)
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            if image.size > settings.POST_IMAGE_MAX_BYTES:
+                raise forms.ValidationError(size_error(image.size))
+            error = check_dimensions(*image.image.size)
+            if error:
+                raise forms.ValidationError(error)
+        return image
+
 
 class CommentForm(forms.ModelForm):
+    """Текст комментария; ответ приходит отдельным скрытым полем parent.
+
+    parent не входит в поля формы: id комментария-родителя берётся из
+    данных запроса и проверяется в clean() — он должен быть у того же
+    поста и не глубже COMMENT_MAX_DEPTH.
+    """
+
     class Meta:
         model = Comment
         fields = ('text',)
+
+    def __init__(self, *args, post=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parents = Comment.objects.filter(post=post).only('path', 'post')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        parent_id = self.data.get('parent')
+        if parent_id:
+            parent = forms.ModelChoiceField(self.parents).clean(parent_id)
+            if parent.depth >= settings.COMMENT_MAX_DEPTH:
+                raise forms.ValidationError(
+                    'Слишком глубокая ветка, ответьте выше по ветке.')
+            self.instance.parent = parent
+        return cleaned_data
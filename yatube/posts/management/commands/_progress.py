@@ -0,0 +1,30 @@
+import time
+
+
+class Progress:
+    """Считает строки и печатает скорость импорта или экспорта."""
+
+    def __init__(self, stdout, every):
+        self.stdout = stdout
+        self.every = every
+        self.started = time.monotonic()
+        self.counts = {}
+        self.total = 0
+
+    def add(self, model, rows):
+        before = self.total // self.every
+        self.counts[model] = self.counts.get(model, 0) + rows
+        self.total += rows
+        if self.total // self.every > before:
+            self.report()
+
+    def rate(self):
+        return self.total / max(time.monotonic() - self.started, 1e-6)
+
+    def report(self):
+        self.stdout.write(f'{self.total} строк, {self.rate():.0f} строк/с')
+
+    def summary(self):
+        for model, rows in self.counts.items():
+            self.stdout.write(f'{model}: {rows}')
+        self.report()
@@ -0,0 +1,128 @@
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (setup_databases, setup_test_environment,
+                               teardown_databases, teardown_test_environment)
+from django.utils import timezone
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = ('Нагружает все адреса posts.urls на синтетических данных '
+            'во временной базе и сохраняет результаты в JSON')
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.SCALE.items():
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Запросов на каждый адрес')
+        parser.add_argument('--views', nargs='+', metavar='VIEW',
+                            help='Замерять только эти адреса')
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кеш перед каждым запросом')
+        parser.add_argument('--loaders', action='store_true',
+                            help='Сравнить рендер без кеша шаблонов и с ним')
+        parser.add_argument('--engines', action='store_true',
+                            help='Сравнить рендер лент на Django и Jinja2')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Файл для результатов в JSON')
+        parser.add_argument('--compare', metavar='PATH',
+                            help='Сравнить с прошлым прогоном')
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help='Допустимое ухудшение метрики, доля')
+
+    def handle(self, *args, **options):
+        scale = {name: options[name] for name in benchmark.SCALE}
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf8') as file:
+                    baseline = json.load(file)['views']
+            except (OSError, ValueError, KeyError) as error:
+                raise CommandError(f'Не прочитать {options["compare"]}: '
+                                   f'{error}')
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=False)
+        try:
+            benchmark.seed(**scale, seed=options['seed'])
+            views, variants = self.measure(options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'revision': self.revision(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'cache': settings.CACHES['default']['BACKEND'],
+                'requests': options['requests'],
+                'cold': options['cold'],
+                'seed': options['seed'],
+                **scale,
+            },
+            'views': views,
+        }
+        if variants is not None:
+            report['variants'] = variants
+        else:
+            self.print_table(views)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+        if baseline is not None:
+            regressions = benchmark.compare(
+                baseline, views, options['threshold'])
+            for line in regressions:
+                self.stdout.write(self.style.WARNING(line))
+            if regressions:
+                raise CommandError(f'Регрессий: {len(regressions)}')
+            self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    def measure(self, options):
+        """Результаты по адресам и, с --loaders или --engines, по вариантам.
+
+        С вариантами результатом прогона считается последний из них.
+        """
+        if options['loaders']:
+            compare = benchmark.compare_loaders
+        elif options['engines']:
+            compare = benchmark.compare_engines
+        else:
+            return benchmark.run(
+                options['requests'], cold=options['cold'],
+                only=options['views'], seed=options['seed']), None
+        variants = compare(
+            options['requests'], only=options['views'], seed=options['seed'])
+        self.print_variants(variants)
+        return list(variants.values())[-1], variants
+
+    def print_table(self, views):
+        columns = ('status', 'rps', 'p50_ms', 'p95_ms', 'p99_ms',
+                   'queries', 'bytes')
+        self.stdout.write(f'{"view":<18}' + ''.join(
+            f'{column:>10}' for column in columns))
+        for name, metrics in views.items():
+            self.stdout.write(f'{name:<18}' + ''.join(
+                f'{metrics[column]:>10}' for column in columns))
+
+    def print_variants(self, variants):
+        columns = ('tpl_ms', 'p50_ms')
+        self.stdout.write(f'{"view":<18}' + ''.join(
+            f'{label + ":" + column:>18}' for column in columns
+            for label in variants))
+        for name in next(iter(variants.values())):
+            self.stdout.write(f'{name:<18}' + ''.join(
+                f'{variants[label][name][column]:>18}' for column in columns
+                for label in variants))
+
+    @staticmethod
+    def revision():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
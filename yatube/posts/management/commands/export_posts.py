@@ -0,0 +1,46 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from posts.models import Comment, Follow, Group, Post
+
+from ._progress import Progress
+
+# Модель в JSONL -> (queryset, поля values()).
+EXPORTS = (
+    ('group', Group.objects, ('title', 'slug', 'description')),
+    ('post', Post.objects, (
+        'id', 'text', 'pub_date', 'image', 'author__username',
+        'group__slug')),
+    ('comment', Comment.objects.filter(post__isnull=False), (
+        'id', 'parent_id', 'path', 'post_id', 'author__username', 'text',
+        'created')),
+    ('follow', Follow.objects, ('user__username', 'author__username')),
+)
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает группы, посты, комментарии и подписки в JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-',
+                            help='Файл выгрузки, по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, path, chunk_size, **options):
+        out = sys.stdout if path == '-' else open(path, 'w', encoding='utf8')
+        progress = Progress(self.stderr, chunk_size * 10)
+        try:
+            for model, queryset, fields in EXPORTS:
+                rows = queryset.order_by('pk').values(*fields).iterator(
+                    chunk_size=chunk_size)
+                for row in rows:
+                    out.write(json.dumps(
+                        {'model': model, 'fields': row},
+                        ensure_ascii=False, default=str))
+                    out.write('\n')
+                    progress.add(model, 1)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        progress.summary()
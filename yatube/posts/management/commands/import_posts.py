@@ -0,0 +1,159 @@
+import json
+import sys
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+from posts import counters, search, timeline
+from posts.cache import ALL_FEEDS, bump_feeds
+from posts.models import Comment, Follow, Group, Post, User
+from posts.utils import keep_timestamps
+
+from ._progress import Progress
+
+
+class Importer:
+    """Загружает пакеты выгрузки.
+
+    id постов и комментариев сдвигаются за наибольшие имеющиеся: в пустую
+    базу они попадают как есть, в непустую — не пересекаются с её
+    записями. Ссылки на родителя и path комментариев сдвигаются так же.
+    """
+
+    def __init__(self):
+        self.users = {}
+        self.groups = {}
+        self.authors = set()
+        self.post_offset = Post.objects.aggregate(
+            last=Max('pk'))['last'] or 0
+        self.comment_offset = Comment.objects.aggregate(
+            last=Max('pk'))['last'] or 0
+
+    def user_ids(self, usernames):
+        missing = set(usernames) - self.users.keys()
+        if missing:
+            self.users.update(User.objects.filter(
+                username__in=missing).values_list('username', 'pk'))
+            new = missing - self.users.keys()
+            User.objects.bulk_create(
+                User(username=name, password=make_password(None))
+                for name in new)
+            self.users.update(User.objects.filter(
+                username__in=new).values_list('username', 'pk'))
+        return self.users
+
+    def group_ids(self, slugs):
+        missing = set(slugs) - self.groups.keys() - {None}
+        if missing:
+            self.groups.update(Group.objects.filter(
+                slug__in=missing).values_list('slug', 'pk'))
+        return self.groups
+
+    def group(self, rows):
+        Group.objects.bulk_create(
+            (Group(**row) for row in rows), ignore_conflicts=True)
+
+    def post(self, rows):
+        users = self.user_ids(row['author__username'] for row in rows)
+        groups = self.group_ids(row['group__slug'] for row in rows)
+        posts = Post.objects.bulk_create(
+            Post(id=row['id'] + self.post_offset, text=row['text'],
+                 pub_date=parse_datetime(row['pub_date']),
+                 image=row['image'],
+                 author_id=users[row['author__username']],
+                 group_id=groups.get(row['group__slug']))
+            for row in rows)
+        search.backend().index(posts)
+        self.authors.update(users[row['author__username']] for row in rows)
+
+    def comment_path(self, path):
+        """path с id предков, сдвинутыми на comment_offset."""
+        return ''.join(
+            f'{int(pk) + self.comment_offset:010d}.'
+            for pk in path.split('.') if pk)
+
+    def comment(self, rows):
+        users = self.user_ids(row['author__username'] for row in rows)
+        offset = self.comment_offset
+        Comment.objects.bulk_create(
+            Comment(id=row['id'] + offset,
+                    parent_id=row['parent_id'] and row['parent_id'] + offset,
+                    path=self.comment_path(row['path']),
+                    post_id=row['post_id'] + self.post_offset,
+                    text=row['text'],
+                    created=parse_datetime(row['created']),
+                    author_id=users[row['author__username']])
+            for row in rows)
+
+    def follow(self, rows):
+        users = self.user_ids(
+            name for row in rows
+            for name in (row['user__username'], row['author__username']))
+        Follow.objects.bulk_create(
+            (Follow(user_id=users[row['user__username']],
+                    author_id=users[row['author__username']])
+             for row in rows
+             if row['user__username'] != row['author__username']),
+            ignore_conflicts=True)
+        self.authors.update(users[row['author__username']] for row in rows)
+
+    def rebuild_derived(self):
+        """Счётчики, ленты подписок и кеш, которые bulk_create обходит."""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                    no_style(), [Post, Comment]):
+                cursor.execute(sql)
+        counters.reconcile()
+        timeline.backfill_followers(self.authors)
+        bump_feeds(ALL_FEEDS, 'index')
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает JSONL из export_posts пакетами bulk_create. '
+            'id постов и комментариев сдвигаются за наибольшие id в базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-',
+                            help='Файл выгрузки, по умолчанию stdin')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, path, batch_size, **options):
+        source = sys.stdin if path == '-' else open(path, encoding='utf8')
+        importer = Importer()
+        progress = Progress(self.stdout, batch_size * 10)
+        model, batch = None, []
+
+        def flush():
+            if batch:
+                with transaction.atomic():
+                    getattr(importer, model)(batch)
+                progress.add(model, len(batch))
+                batch.clear()
+
+        try:
+            with keep_timestamps():
+                for number, line in enumerate(source, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError as error:
+                        raise CommandError(f'Строка {number}: {error}')
+                    if record['model'] not in (
+                            'group', 'post', 'comment', 'follow'):
+                        raise CommandError(
+                            f'Строка {number}: неизвестная модель '
+                            f'{record["model"]}')
+                    if record['model'] != model or len(batch) >= batch_size:
+                        flush()
+                        model = record['model']
+                    batch.append(record['fields'])
+                flush()
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        importer.rebuild_derived()
+        progress.summary()
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов и комментариев'
+
+    def handle(self, *args, **options):
+        for name, fixed in reconcile().items():
+            self.stdout.write(f'{name}: исправлено {fixed}')
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from posts import warmup
+
+
+class Command(BaseCommand):
+    help = ('Рендерит в кеш первые страницы главной, крупнейших групп и '
+            'авторов с наибольшим числом подписчиков')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=3,
+                            help='Страниц каждой ленты')
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--profiles', type=int, default=50)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--host', default=settings.ALLOWED_HOSTS[0],
+                            help='Host для запросов, из ALLOWED_HOSTS')
+
+    def handle(self, *args, pages, groups, profiles, workers, host,
+               **options):
+        if pages < 1 or workers < 1:
+            raise CommandError('--pages и --workers должны быть больше 0')
+        started = time.perf_counter()
+        urls = warmup.targets(pages, groups, profiles)
+        self.stdout.write(f'Страниц к прогреву: {len(urls)}')
+        every = max(len(urls) // 10, 1)
+
+        def progress(done, total):
+            if done % every == 0 or done == total:
+                self.stdout.write(f'{done}/{total}')
+
+        results = warmup.warm(urls, workers, host, progress)
+        timings = sorted(elapsed for _, _, elapsed in results)
+        failed = [(url, status) for url, status, _ in results
+                  if status != 200]
+        for url, status in failed:
+            self.stdout.write(self.style.WARNING(f'{status} {url}'))
+        if timings:
+            self.stdout.write(
+                f'p50 {timings[len(timings) // 2] * 1000:.0f} мс, '
+                f'p95 {timings[int(len(timings) * 0.95)] * 1000:.0f} мс, '
+                f'max {timings[-1] * 1000:.0f} мс')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Прогрето {len(results) - len(failed)} из {len(urls)} '
+            f'за {elapsed:.1f} с'))
@@ -0,0 +1,70 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import parse_http_date_safe
+
+from .cache import ALL_FEEDS, feed_versions
+from .edge import surrogate_key
+
+
+def page_key(request):
+    url = request.build_absolute_uri()
+    return f'page:{hashlib.md5(url.encode()).hexdigest()}'
+
+
+class AnonymousPageCacheMiddleware:
+    """Готовые страницы лент для гостей, до сессии, CSRF и шаблонов.
+
+    Кешируются ответы view с feed_condition: в записи лежат имена лент
+    страницы и их версии. Запись годна, пока версии не сменились, так что
+    bump_feeds сбрасывает и её. Гость — запрос без cookie сессии: вошедший
+    пользователь видит свою шапку и подписки и идёт мимо кеша.
+
+    Ответ гостю несёт Surrogate-Key с именами лент и Surrogate-Control на
+    EDGE_CACHE_TIMEOUT: обратный прокси кеширует запросы без cookie
+    сессии, а bump_feeds чистит его по этим ключам.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (request.method not in ('GET', 'HEAD')
+                or settings.SESSION_COOKIE_NAME in request.COOKIES):
+            return self.get_response(request)
+        key = page_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            names, versions, response = entry
+            if feed_versions(*names) == versions:
+                return self.conditional(request, response)
+        response = self.get_response(request)
+        names = getattr(request, '_feed_names', None)
+        if names is None or not self.cacheable(response):
+            return response
+        self.patch_edge(response, names)
+        if request.method == 'GET':
+            cache.set(key, (names, request._feed_versions, response),
+                      settings.PAGE_CACHE_TIMEOUT)
+        return response
+
+    def cacheable(self, response):
+        return (response.status_code == 200 and not response.streaming
+                and not response.cookies
+                and not response.has_header('Vary'))
+
+    def patch_edge(self, response, names):
+        patch_cache_control(response, public=True)
+        response['Surrogate-Key'] = surrogate_key([ALL_FEEDS, *names])
+        response['Surrogate-Control'] = (
+            f'max-age={settings.EDGE_CACHE_TIMEOUT}')
+
+    def conditional(self, request, response):
+        """304 по ETag и Last-Modified записи, как ConditionalGetMiddleware."""
+        return get_conditional_response(
+            request, etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')),
+            response=response)
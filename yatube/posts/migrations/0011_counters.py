@@ -0,0 +1,57 @@
+# Generated by Django 2.2.16 on 2026-10-16 20:43
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    Comment = apps.get_model('posts', 'Comment')
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    authors = Post.objects.order_by().values('author_id').annotate(
+        total=models.Count('pk'))
+    AuthorStats.objects.bulk_create(
+        (AuthorStats(user_id=row['author_id'], posts_count=row['total'])
+         for row in authors.iterator()),
+        batch_size=1000)
+    groups = Post.objects.filter(group__isnull=False).order_by().values(
+        'group_id').annotate(total=models.Count('pk'))
+    for row in groups.iterator():
+        Group.objects.filter(pk=row['group_id']).update(
+            posts_count=row['total'])
+    posts = Comment.objects.filter(post__isnull=False).order_by().values(
+        'post_id').annotate(total=models.Count('pk'))
+    for row in posts.iterator():
+        Post.objects.filter(pk=row['post_id']).update(
+            comments_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0010_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Постов в сообществе'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
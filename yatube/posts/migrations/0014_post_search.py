@@ -0,0 +1,37 @@
+import re
+
+from django.db import migrations
+
+# Стеммер — чистая функция без моделей; posts.search здесь не
+# импортируется, чтобы миграция не зависела от текущих моделей.
+from posts.stemmer import stem
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Post = apps.get_model('posts', 'Post')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE VIRTUAL TABLE posts_post_fts USING fts5("
+            "body, prefix='2 3', tokenize='unicode61 remove_diacritics 2')")
+        cursor.executemany(
+            'INSERT INTO posts_post_fts (rowid, body) VALUES (%s, %s)',
+            ((pk, ' '.join(stem(word) for word in re.findall(r'\w+', text)))
+             for pk, text in Post.objects.values_list('pk', 'text').iterator()))
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_thumbnail'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-16 23:05
+
+from django.db import migrations, models
+
+
+def fill_followers(apps, schema_editor):
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    Follow = apps.get_model('posts', 'Follow')
+    authors = Follow.objects.order_by().values('author_id').annotate(
+        total=models.Count('pk'))
+    for row in authors.iterator():
+        AuthorStats.objects.update_or_create(
+            user_id=row['author_id'],
+            defaults={'followers_count': row['total']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='followers_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(fill_followers, migrations.RunPython.noop),
+    ]
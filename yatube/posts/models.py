@@ -1,6 +1,6 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 
 User = get_user_model()
 
@@ -14,6 +14,8 @@ class Group(models.Model):
         help_text='Укажите одним словом тематику сообщений в сообществе')
     description = models.TextField(
         verbose_name='Описание сообщества')
+    posts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Постов в сообществе')
 
     class Meta:
         verbose_name = 'Сообщество',
@@ -23,6 +25,19 @@ class Group(models.Model):
         return self.title
 
 
+FEED_FIELDS = (
+    'text', 'pub_date', 'image', 'thumbnail', 'version', 'author', 'group',
+    'author__username', 'author__first_name', 'author__last_name',
+    'group__slug', 'group__title',
+)
+
+
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для ленты: автор и группа одним JOIN, без лишних колонок."""
+        return self.select_related('author', 'group').only(*FEED_FIELDS)
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст сообщения')
@@ -49,15 +64,94 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Комментариев')
+    thumbnail = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        verbose_name='Префикс URL превью')
+    version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия',
+        help_text='Растёт при каждом изменении, входит в ключ кеша карточки')
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Сообщение',
         verbose_name_plural = 'Сообщения'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx'),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_feed_idx'),
+        ]
+
+    _loaded_group_id = None
+    _loaded_image = ''
 
     def __str__(self):
         return self.text[:settings.LEN_OF_POSTS]
 
+    @property
+    def image_changed(self):
+        if self._loaded_image is None:
+            return False
+        return self.image.name != self._loaded_image
+
+    def save(self, *args, **kwargs):
+        """Сохраняет пост; у изменённого версия растёт в самом UPDATE.
+
+        version и thumbnail пишет и фоновая генерация превью. Версия
+        сдвигается через F(), а thumbnail не сохраняется, пока картинка
+        та же, — иначе правка затёрла бы готовое превью и вернула версию,
+        под которой уже лежит другая карточка.
+        """
+        changed = self.image_changed
+        if changed:
+            self.thumbnail = ''
+        updating = not self._state.adding
+        if updating:
+            fields = kwargs.get('update_fields')
+            if fields is None:
+                deferred = self.get_deferred_fields()
+                fields = [field.name for field in self._meta.concrete_fields
+                          if not field.primary_key
+                          and field.attname not in deferred]
+            fields = {*fields, 'version'}
+            if not changed:
+                fields.discard('thumbnail')
+            kwargs['update_fields'] = fields
+            self.version = models.F('version') + 1
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if updating:
+                self.refresh_from_db(fields=['version', 'thumbnail'])
+        self._loaded_group_id = self.group_id
+        self._loaded_image = self.image.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_group_id = instance.__dict__.get('group_id')
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
+
+
+class CommentQuerySet(models.QuerySet):
+    def subtrees(self, roots):
+        """Все ответы на комментарии roots одним запросом по path."""
+        ranges = models.Q()
+        for root in roots:
+            prefix = root.subtree_prefix
+            ranges |= models.Q(path__gte=prefix, path__lt=prefix[:-1] + '/')
+        return self.filter(ranges) if ranges else self.none()
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -72,13 +166,48 @@ class Comment(models.Model):
                             help_text='Введите текст комментария')
     created = models.DateTimeField(
         'Дата публикации', auto_now_add=True)
+    parent = models.ForeignKey(
+        'self',
+        blank=True,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='replies',
+        verbose_name='Ответ на')
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name='Путь в ветке',
+        help_text='id предков через точку; пусто у комментария к посту')
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=('post', '-created', '-id'), name='comment_post_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
+    @property
+    def depth(self):
+        return self.path.count('.')
+
+    @property
+    def subtree_prefix(self):
+        """Начало path у всех ответов в ветке этого комментария."""
+        return f'{self.path}{self.pk:010d}.'
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.parent_id is not None:
+            self.path = self.parent.subtree_prefix
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Follow(models.Model):
     user = models.ForeignKey(User,
@@ -86,3 +215,52 @@ class Follow(models.Model):
                              related_name='follower')
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='following')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='no_self_follow'),
+        ]
+
+
+class AuthorStats(models.Model):
+    """Счётчики автора, которые нельзя хранить в auth.User."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats')
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0, db_index=True)
+
+
+class TimelineEntry(models.Model):
+    """Материализованная лента подписок: пост, разосланный подписчику."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='timeline')
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+')
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-id')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique_timeline_post'),
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', '-pub_date', '-id'), name='timeline_feed_idx'),
+            models.Index(
+                fields=('user', 'author'), name='timeline_author_idx'),
+        ]
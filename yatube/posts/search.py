@@ -0,0 +1,169 @@
+import base64
+import binascii
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Post
+from .stemmer import stem
+
+WORDS = re.compile(r'\w+\*?')
+
+
+def terms(query):
+    """Слова запроса: (основа, префикс ли). «прог*» ищет по префиксу.
+
+    Префикс тоже сводится к основе: в индексе лежат основы, и целое
+    слово со звёздочкой длиннее своей основы иначе ничего не нашло бы.
+    """
+    return [
+        (stem(word[:-1]), True) if word.endswith('*')
+        else (stem(word), False)
+        for word in WORDS.findall(query)
+    ][:settings.SEARCH_MAX_TERMS]
+
+
+def document(text):
+    """Текст поста в виде основ слов для индекса."""
+    return ' '.join(stem(word) for word in re.findall(r'\w+', text))
+
+
+def encode_cursor(score, pk):
+    raw = f'{score!r}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор в (score, id) или возвращает None."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        score, pk = raw.split('|')
+        return float(score), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
+
+class SearchBackend(ABC):
+    """Интерфейс поиска по постам.
+
+    search() возвращает пары (id, score) по возрастанию score, затем id:
+    меньший score — более релевантный пост. after — пара последнего
+    показанного результата для пагинации по ключу.
+    """
+
+    def index(self, posts):
+        pass
+
+    def remove(self, post_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    @abstractmethod
+    def search(self, query, after=None, limit=10):
+        pass
+
+
+class LikeBackend(SearchBackend):
+    """Запасной поиск для любой БД: icontains по словам, новые сверху."""
+
+    def search(self, query, after=None, limit=10):
+        condition = Q()
+        for term, _ in terms(query):
+            condition &= Q(text__icontains=term)
+        if not condition:
+            return []
+        posts = Post.objects.filter(condition)
+        if after is not None:
+            posts = posts.filter(pk__lt=after[1])
+        return [(pk, -pk) for pk in posts.order_by('-pk').values_list(
+            'pk', flat=True)[:limit]]
+
+
+class SqliteFTSBackend(SearchBackend):
+    """FTS5 с ранжированием bm25 по основам слов из stemmer.
+
+    Таблица posts_post_fts создаётся миграцией; rowid совпадает с id поста.
+    """
+
+    table = 'posts_post_fts'
+
+    def index(self, posts):
+        posts = list(posts)
+        self.remove(post.pk for post in posts)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, body) VALUES (%s, %s)',
+                [(post.pk, document(post.text)) for post in posts])
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk in post_ids])
+
+    def rebuild(self, batch_size=2000):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+        batch = []
+        for post in Post.objects.only('text').iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                batch = []
+        self.index(batch)
+
+    def match(self, query):
+        return ' '.join(
+            '"{}"{}'.format(term.replace('"', ''), '*' if prefix else '')
+            for term, prefix in terms(query) if term)
+
+    def search(self, query, after=None, limit=10):
+        match = self.match(query)
+        if not match:
+            return []
+        sql = (f'SELECT rowid, bm25({self.table}) AS score FROM {self.table} '
+               f'WHERE {self.table} MATCH %s')
+        params = [match]
+        if after is not None:
+            sql += ' AND (score > %s OR (score = %s AND rowid > %s))'
+            params += [after[0], after[0], after[1]]
+        sql += ' ORDER BY score, rowid LIMIT %s'
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [limit])
+            return cursor.fetchall()
+
+
+@lru_cache(maxsize=None)
+def backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+class SearchPaginator(Paginator):
+    """Пагинация выдачи поиска по ключу (score, id), только вперёд."""
+
+    def __init__(self, query, per_page):
+        super().__init__([], per_page)
+        self.query = query
+
+    def get_cursor_page(self, cursor=None):
+        after = decode_cursor(cursor) if cursor else None
+        hits = backend().search(self.query, after, self.per_page + 1)
+        has_next = len(hits) > self.per_page
+        hits = hits[:self.per_page]
+        posts = Post.objects.for_feed().in_bulk([pk for pk, _ in hits])
+        page = Page([posts[pk] for pk, _ in hits if pk in posts], None, self)
+        page.is_keyset = True
+        page.next_cursor = None
+        if has_next:
+            pk, score = hits[-1]
+            page.next_cursor = encode_cursor(score, pk)
+        page.previous_cursor = None
+        return page
@@ -0,0 +1,105 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, follows, search, thumbnails, timeline
+from .cache import ALL_FEEDS, bump_feeds, feed_names
+from .models import Comment, Follow, Group, Post, User
+
+# Поля автора, которые выводят карточки и ленты.
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    names = feed_names(instance)
+    if instance._loaded_group_id not in (None, instance.group_id):
+        names.append(f'group:{instance._loaded_group_id}')
+    bump_feeds(*names)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_author_posts(instance.author_id, 1)
+        counters.change_group_posts(instance.group_id, 1)
+        timeline.fan_out(instance)
+    elif instance._loaded_group_id != instance.group_id:
+        counters.change_group_posts(instance._loaded_group_id, -1)
+        counters.change_group_posts(instance.group_id, 1)
+    if instance.image and instance.image_changed:
+        thumbnails.schedule_thumbnails(instance)
+    search.backend().index([instance])
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_author_posts(instance.author_id, -1)
+    counters.change_group_posts(instance.group_id, -1)
+    search.backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    bump_feeds(ALL_FEEDS)
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, update_fields, **kwargs):
+    """Смена имени сбрасывает ленты: у карточек автора новый ключ."""
+    if created or (update_fields is not None
+                   and not AUTHOR_FIELDS & set(update_fields)):
+        return
+    bump_feeds(ALL_FEEDS)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        counters.change_post_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_post_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """Сбрасывает ленты поста комментария.
+
+    Пост берётся из кеша связи или одним values() по post_id: при
+    каскадном удалении автора пост уже может быть удалён, тогда его
+    ленты сбросил сам post_delete поста.
+    """
+    if instance.post_id is None:
+        return
+    if Comment._meta.get_field('post').is_cached(instance):
+        post = instance.post
+    else:
+        row = Post.objects.filter(pk=instance.post_id).values(
+            'author_id', 'group_id').first()
+        if row is None:
+            return
+        post = Post(**row)
+    bump_feeds(*feed_names(post))
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        counters.change_author_followers([instance.author_id], 1)
+        timeline.backfill(instance.user_id, instance.author_id)
+    bump_feeds(f'follow:{instance.user_id}')
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    if follows.batch.get():
+        return
+    counters.change_author_followers([instance.author_id], -1)
+    timeline.leave_pull([instance.author_id])
+    timeline.remove(instance.user_id, instance.author_id)
+    bump_feeds(f'follow:{instance.user_id}')
@@ -0,0 +1,74 @@
+"""Стеммер Портера (Snowball) для русского языка.
+
+Окончания ищутся только в RV — части слова после первой гласной;
+DERIVATIONAL отрезается только в R2, как в описании алгоритма.
+"""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = re.compile(
+    r'(ив|ивши|ившись|ыв|ывши|ывшись|(?<=[ая])(в|вши|вшись))$')
+REFLEXIVE = re.compile(r'(ся|сь)$')
+ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых'
+    r'|ую|юю|ая|яя|ою|ею)$')
+PARTICIPLE = re.compile(r'(ивш|ывш|ующ|(?<=[ая])(ем|нн|вш|ющ|щ))$')
+VERB = re.compile(
+    r'(ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено'
+    r'|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю'
+    r'|(?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно))$')
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем'
+    r'|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$')
+DERIVATIONAL = re.compile(r'ость?$')
+SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+I_ENDING = re.compile(r'и$')
+
+
+def regions(word):
+    """Начала RV и R2 в слове."""
+    def after_vowel_gap(start):
+        for i in range(start + 1, len(word)):
+            if word[i] not in VOWELS and word[i - 1] in VOWELS:
+                return i + 1
+        return len(word)
+
+    rv = next((i + 1 for i, char in enumerate(word) if char in VOWELS),
+              len(word))
+    return rv, after_vowel_gap(after_vowel_gap(0))
+
+
+def cut(pattern, word):
+    """Отрезает окончание; возвращает (слово, отрезано ли)."""
+    stem = pattern.sub('', word, 1)
+    return stem, stem != word
+
+
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = regions(word)
+    prefix, ending = word[:rv], word[rv:]
+    ending, found = cut(PERFECTIVE_GERUND, ending)
+    if not found:
+        ending, _ = cut(REFLEXIVE, ending)
+        ending, found = cut(ADJECTIVE, ending)
+        if found:
+            ending, _ = cut(PARTICIPLE, ending)
+        else:
+            ending, found = cut(VERB, ending)
+            if not found:
+                ending, _ = cut(NOUN, ending)
+    ending, _ = cut(I_ENDING, ending)
+    match = DERIVATIONAL.search(ending)
+    if match and rv + match.start() >= r2:
+        ending = ending[:match.start()]
+    if ending.endswith('нн'):
+        ending = ending[:-1]
+    else:
+        ending, found = cut(SUPERLATIVE, ending)
+        if found and ending.endswith('нн'):
+            ending = ending[:-1]
+        elif not found and ending.endswith('ь'):
+            ending = ending[:-1]
+    return prefix + ending
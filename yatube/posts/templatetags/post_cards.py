@@ -0,0 +1,51 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CARD_KEY = 'post-card:{}:{}:{}:{}'
+
+
+def author_digest(author):
+    """Отпечаток полей автора, которые выводит карточка."""
+    raw = '\0'.join((author.username, author.first_name, author.last_name))
+    return hashlib.md5(raw.encode()).hexdigest()[:12]
+
+
+def card_key(post, template_name, key=CARD_KEY):
+    return key.format(template_name, post.pk, post.version,
+                      author_digest(post.author))
+
+
+def render_cards(posts, template_name, card_key_format=CARD_KEY, using=None):
+    """Пары (пост, html карточки template_name) для страницы ленты.
+
+    Карточки не зависят от зрителя и берутся из кеша одним get_many по
+    ключу из шаблона, id и версии поста и отпечатка автора: правка поста
+    и смена имени автора дают новый ключ. Недостающие рендерятся
+    движком using и кладутся одним set_many. У каждого движка свой
+    формат ключа.
+    """
+    posts = list(posts)
+    keys = {post.pk: card_key(post, template_name, card_key_format)
+            for post in posts}
+    cards = cache.get_many(keys.values())
+    missing = {
+        keys[post.pk]: render_to_string(
+            template_name, {'post': post}, using=using)
+        for post in posts if keys[post.pk] not in cards
+    }
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_TIMEOUT)
+        cards.update(missing)
+    return [(post, mark_safe(cards[keys[post.pk]])) for post in posts]
+
+
+@register.simple_tag
+def post_cards(posts, template_name):
+    return render_cards(posts, template_name)
@@ -0,0 +1,234 @@
+import json
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test_group')
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый текст {i}', author=cls.user, group=cls.group)
+            for i in range(settings.POST_LIST + 3))
+        cls.post = Post.objects.create(text='Последний пост', author=cls.user,
+                                       group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def send(self, client, method, url, data):
+        return getattr(client, method)(
+            url, json.dumps(data), content_type='application/json')
+
+    def test_feed_pages(self):
+        """Лента листается курсорами, строки — только из values()."""
+        url = reverse('api:posts')
+        with self.assertNumQueries(1):
+            first = self.guest_client.get(url).json()
+        self.assertEqual(len(first['results']), settings.POST_LIST)
+        self.assertEqual(first['results'][0]['id'], self.post.pk)
+        self.assertEqual(first['results'][0]['author'], 'auth')
+        self.assertEqual(first['results'][0]['group'], 'test_group')
+        second = self.guest_client.get(
+            url, {'cursor': first['next']}).json()
+        self.assertEqual(len(second['results']), 4)
+        self.assertIsNone(second['next'])
+        self.assertEqual(Post.objects.count(),
+                         len(first['results']) + len(second['results']))
+
+    def test_field_selection(self):
+        """?fields= оставляет в ответе только нужные поля."""
+        response = self.guest_client.get(
+            reverse('api:post', kwargs={'post_id': self.post.pk}),
+            {'fields': 'id,text'})
+        self.assertEqual(response.json(),
+                         {'id': self.post.pk, 'text': 'Последний пост'})
+        response = self.guest_client.get(reverse('api:posts'),
+                                         {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag(self):
+        """Неизменная лента отвечает 304, новый пост меняет ETag."""
+        url = reverse('api:group_posts', kwargs={'slug': 'test_group'})
+        etag = self.guest_client.get(url)['ETag']
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(text='Новый', author=self.user, group=self.group)
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_post_write(self):
+        """Создание, правка и удаление поста; чужой пост не меняется."""
+        response = self.send(self.guest_client, 'post', reverse('api:posts'),
+                             {'text': 'Из API'})
+        self.assertEqual(response.status_code, 401)
+        response = self.send(self.author_client, 'post', reverse('api:posts'),
+                             {'text': 'Из API', 'group': self.group.pk})
+        self.assertEqual(response.status_code, 201)
+        created = response.json()
+        self.assertEqual(created['group'], 'test_group')
+        url = reverse('api:post', kwargs={'post_id': created['id']})
+        response = self.send(self.reader_client, 'patch', url,
+                             {'text': 'Чужая правка'})
+        self.assertEqual(response.status_code, 403)
+        response = self.send(self.author_client, 'patch', url,
+                             {'text': 'Правка'})
+        self.assertEqual(response.json()['text'], 'Правка')
+        self.assertEqual(response.json()['group'], 'test_group')
+        self.assertEqual(self.author_client.delete(url).status_code, 204)
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+    def test_patch_form(self):
+        """PATCH формой меняет пост; multipart в PATCH не принимается."""
+        url = reverse('api:post', kwargs={'post_id': self.post.pk})
+        response = self.author_client.patch(
+            url, urlencode({'text': 'Правка формой'}),
+            content_type='application/x-www-form-urlencoded')
+        self.assertEqual(response.status_code, 200)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'Правка формой')
+        response = self.author_client.patch(
+            url, 'text=x', content_type='multipart/form-data; boundary=x')
+        self.assertEqual(response.status_code, 415)
+
+    def test_comments(self):
+        """Комментарии добавляются и отдаются страницей."""
+        url = reverse('api:comments', kwargs={'post_id': self.post.pk})
+        response = self.send(self.reader_client, 'post', url,
+                             {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Comment.objects.get().author, self.reader)
+        results = self.guest_client.get(url).json()['results']
+        self.assertEqual(
+            [(row['author'], row['text']) for row in results],
+            [('reader', 'Комментарий')])
+
+    def test_follows_and_follow_feed(self):
+        """Подписка, лента подписок и отписка."""
+        url = reverse('api:follows')
+        self.assertEqual(self.guest_client.get(url).status_code, 401)
+        response = self.send(self.reader_client, 'post', url,
+                             {'author': 'auth'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.reader_client.get(url).json(),
+                         {'results': ['auth']})
+        feed = self.reader_client.get(reverse('api:follow_feed')).json()
+        self.assertEqual(feed['results'][0]['id'], self.post.pk)
+        self.assertEqual(len(feed['results']), settings.POST_LIST)
+        response = self.reader_client.delete(
+            reverse('api:follow', kwargs={'username': 'auth'}))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_groups(self):
+        """Список и карточка группы."""
+        groups = self.guest_client.get(reverse('api:groups')).json()
+        self.assertEqual(groups['results'][0]['slug'], 'test_group')
+        response = self.guest_client.get(
+            reverse('api:group', kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'Не найдено.'})
+
+
+class ApiBatchTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [User.objects.create_user(username=f'author{i}')
+                       for i in range(5)]
+        cls.posts = [Post.objects.create(text=f'Пост {i}', author=author)
+                     for i, author in enumerate(cls.authors)]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.names = [author.username for author in self.authors]
+
+    def send(self, method, data):
+        return getattr(self.client, method)(
+            reverse('api:follows'), json.dumps(data),
+            content_type='application/json')
+
+    def test_follow_many(self):
+        """Пакетная подписка не зависит по запросам от числа авторов."""
+        with self.assertNumQueries(7):
+            response = self.send('post', {
+                'authors': [*self.names, 'reader', 'nobody']})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(),
+                         {'followed': self.names, 'missing': ['nobody']})
+        self.assertEqual(Follow.objects.filter(user=self.reader).count(), 5)
+        feed = self.client.get(reverse('api:follow_feed')).json()
+        self.assertEqual({row['id'] for row in feed['results']},
+                         {post.pk for post in self.posts})
+        response = self.send('post', {'authors': self.names[:2]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['followed'], [])
+
+    def test_unfollow_many(self):
+        """Пакетная отписка убирает подписки и посты из ленты."""
+        self.send('post', {'authors': self.names})
+        response = self.send('delete', {'authors': self.names[:3]})
+        self.assertEqual(response.json(), {'unfollowed': self.names[:3]})
+        self.assertEqual(
+            sorted(Follow.objects.values_list('author__username', flat=True)),
+            self.names[3:])
+        feed = self.client.get(reverse('api:follow_feed')).json()
+        self.assertEqual({row['id'] for row in feed['results']},
+                         {post.pk for post in self.posts[3:]})
+
+    def test_unfollow_many_signals(self):
+        """Пакетная отписка шлёт post_delete, счётчики сдвигаются раз."""
+        self.send('post', {'authors': self.names})
+        deleted = []
+        receiver = (lambda instance, **kwargs: deleted.append(
+            instance.author_id))
+        post_delete.connect(receiver, sender=Follow)
+        try:
+            self.send('delete', {'authors': self.names[:3]})
+        finally:
+            post_delete.disconnect(receiver, sender=Follow)
+        authors = [post.author_id for post in self.posts[:3]]
+        self.assertCountEqual(deleted, authors)
+        self.assertEqual(
+            set(AuthorStats.objects.filter(user_id__in=authors)
+                .values_list('followers_count', flat=True)), {0})
+
+    def test_batch_limit(self):
+        """Пакет больше API_BATCH_LIMIT отклоняется."""
+        names = ['author0'] * (settings.API_BATCH_LIMIT + 1)
+        self.assertEqual(self.send('post', {'authors': names}).status_code,
+                         400)
+        self.assertEqual(self.send('post', {'authors': 'author0'}).status_code,
+                         400)
+
+    def test_posts_batch(self):
+        """Посты по списку id одним запросом и в порядке запроса."""
+        ids = [self.posts[3].pk, self.posts[0].pk, 10 ** 6]
+        with self.assertNumQueries(1):
+            response = Client().get(
+                reverse('api:posts_batch'),
+                {'ids': ','.join(map(str, ids)), 'fields': 'id,author'})
+        self.assertEqual(response.json()['results'], [
+            {'id': self.posts[3].pk, 'author': 'author3'},
+            {'id': self.posts[0].pk, 'author': 'author0'},
+        ])
+        response = Client().get(reverse('api:posts_batch'), {'ids': 'x'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,59 @@
+from core.auth import get_user
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase
+from posts.models import User
+
+
+class CachedUserTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='auth',
+                                             password='Django_2022')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def request(self, session_key):
+        request = RequestFactory().get('/')
+        request.session = SessionStore(session_key)
+        return request
+
+    def test_cached_user(self):
+        """Повторная загрузка пользователя не обращается к базе."""
+        session_key = self.client.session.session_key
+        self.assertEqual(get_user(self.request(session_key)), self.user)
+        with self.assertNumQueries(0):
+            user = get_user(self.request(session_key))
+        self.assertEqual(user, self.user)
+        self.assertTrue(user.is_authenticated)
+
+    def test_anonymous_skips_session(self):
+        """Гость без cookie не читает сессию."""
+        request = self.request(None)
+        with self.assertNumQueries(0):
+            user = get_user(request)
+        self.assertFalse(user.is_authenticated)
+        self.assertFalse(request.session.accessed)
+
+    def test_profile_update(self):
+        """Изменение профиля сразу видно в кешированном пользователе."""
+        session_key = self.client.session.session_key
+        get_user(self.request(session_key))
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        user = get_user(self.request(session_key))
+        self.assertEqual(user.first_name, 'Новое имя')
+
+    def test_password_change(self):
+        """Смена пароля разлогинивает старые сессии, несмотря на кеш."""
+        session_key = self.client.session.session_key
+        get_user(self.request(session_key))
+        self.user.set_password('Другой_пароль_2022')
+        self.user.save()
+        user = get_user(self.request(session_key))
+        self.assertFalse(user.is_authenticated)
+
+    def test_middleware(self):
+        """Вошедший пользователь виден в шаблонах."""
+        response = self.client.get('/')
+        self.assertEqual(response.context['user'], self.user)
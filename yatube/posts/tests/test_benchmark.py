@@ -0,0 +1,56 @@
+from django.test import TestCase
+from posts import benchmark
+from posts.models import AuthorStats, Follow, Post, TimelineEntry
+
+
+class BenchmarkTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        benchmark.seed(users=5, groups=2, posts=30, comments=20, follows=2)
+
+    def test_seed(self):
+        """Засев согласует счётчики и ленты подписок."""
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            30)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+
+    def test_run_covers_all_routes(self):
+        """Замер проходит по всем адресам без ошибок сервера."""
+        results = benchmark.run(requests=2)
+        self.assertEqual(set(results), set(benchmark.routes()))
+        for name, metrics in results.items():
+            with self.subTest(view=name):
+                self.assertIn(metrics['status'], (200, 302))
+                self.assertGreater(metrics['rps'], 0)
+
+    def test_compare(self):
+        """Сравнение находит ухудшения сверх порога."""
+        old = {'index': {'p95_ms': 10, 'rps': 100, 'queries': 1,
+                         'bytes': 1000}}
+        new = {'index': {'p95_ms': 10.5, 'rps': 80, 'queries': 2,
+                         'bytes': 1000}}
+        self.assertEqual(benchmark.compare(old, new, 0.1), [
+            'index.rps: 100 -> 80 (-20%)',
+            'index.queries: 1 -> 2 (+100%)',
+        ])
+
+    def test_compare_loaders(self):
+        """Сравнение загрузчиков замеряет рендер в обоих режимах."""
+        results = benchmark.compare_loaders(requests=1, only=['index'])
+        self.assertEqual(set(results), {'plain', 'cached'})
+        for label, views in results.items():
+            with self.subTest(loader=label):
+                self.assertGreater(views['index']['tpl_ms'], 0)
+
+    def test_compare_engines(self):
+        """Сравнение движков замеряет ленты на Django и Jinja2."""
+        results = benchmark.compare_engines(requests=1, only=['index'])
+        self.assertEqual(set(results), {'django', 'jinja2'})
+        for label, views in results.items():
+            with self.subTest(engine=label):
+                self.assertEqual(views['index']['status'], 200)
+                self.assertGreater(views['index']['tpl_ms'], 0)
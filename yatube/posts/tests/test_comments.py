@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class CommentThreadsTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.user)
+        cls.other_post = Post.objects.create(text='Другой пост',
+                                             author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('posts:post_detail',
+                           kwargs={'post_id': self.post.pk})
+
+    def comment(self, text, parent=None, post=None):
+        return Comment.objects.create(
+            text=text, author=self.user, post=post or self.post,
+            parent=parent)
+
+    def reply(self, parent, text='Ответ'):
+        return self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            data={'text': text, 'parent': parent.pk})
+
+    def test_subtree_single_query(self):
+        """Вся ветка читается одним запросом по path."""
+        root = self.comment('Корень')
+        child = self.comment('Ответ', root)
+        grandchild = self.comment('Ответ на ответ', child)
+        other = self.comment('Другая ветка')
+        self.comment('Ответ в другой ветке', other)
+        self.assertEqual(grandchild.depth, 2)
+        with self.assertNumQueries(1):
+            subtree = list(Comment.objects.subtrees([root]).order_by('id'))
+        self.assertEqual(subtree, [child, grandchild])
+
+    def test_threads_on_page(self):
+        """Ответы выводятся под своей веткой в порядке обхода."""
+        root = self.comment('Корень')
+        self.reply(root, 'Первый ответ')
+        first = Comment.objects.get(text='Первый ответ')
+        self.reply(first, 'Ответ на первый')
+        self.reply(root, 'Второй ответ')
+        self.assertEqual(first.parent, root)
+        response = self.authorized_client.get(self.url)
+        [page_root] = response.context['comments']
+        self.assertEqual(
+            [(comment.text, comment.depth) for comment in page_root.thread],
+            [('Первый ответ', 1), ('Ответ на первый', 2),
+             ('Второй ответ', 1)])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 4)
+
+    def test_reply_form(self):
+        """?reply= кладёт id родителя в скрытое поле, форма — один текст."""
+        root = self.comment('Корень')
+        response = self.authorized_client.get(self.url, {'reply': root.pk})
+        self.assertEqual(list(response.context['form'].fields), ['text'])
+        self.assertContains(
+            response, f'<input type="hidden" name="parent" value="{root.pk}">',
+            html=True)
+        self.assertNotContains(
+            self.authorized_client.get(self.url, {'reply': 'x'}),
+            'name="parent"')
+
+    def test_reply_to_other_post_rejected(self):
+        """Ответить можно только на комментарий этого поста."""
+        foreign = self.comment('Чужой', post=self.other_post)
+        self.reply(foreign)
+        self.assertFalse(Comment.objects.filter(parent=foreign).exists())
+
+    @override_settings(COMMENT_MAX_DEPTH=1)
+    def test_max_depth(self):
+        """Ветка не растёт глубже COMMENT_MAX_DEPTH."""
+        child = self.comment('Ответ', self.comment('Корень'))
+        self.reply(child)
+        self.assertFalse(Comment.objects.filter(parent=child).exists())
+
+    def test_cursor_pages(self):
+        """Комментарии к посту листаются курсором."""
+        for i in range(settings.COMMENT_LIST + 1):
+            self.comment(f'Комментарий {i}')
+        page = self.authorized_client.get(self.url).context['comments']
+        self.assertEqual(len(page), settings.COMMENT_LIST)
+        response = self.authorized_client.get(
+            self.url, {'cursor': page.next_cursor})
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            ['Комментарий 0'])
+
+
+class CommentSignalsTest(TestCase):
+    def test_delete_author_with_commented_posts(self):
+        """Удаление автора, комментировавшего свои посты, не падает."""
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        post = Post.objects.create(text='Пост', author=author)
+        Comment.objects.create(text='Свой', post=post, author=author)
+        Comment.objects.create(text='Чужой', post=post, author=reader)
+        author.delete()
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(list(Comment.objects.values_list('text', 'post')),
+                         [('Чужой', None)])
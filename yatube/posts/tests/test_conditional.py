@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import _get_new_csrf_token
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test_group')
+        cls.post = Post.objects.create(author=cls.user, group=cls.group,
+                                       text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def revalidate(self, client, url):
+        """Повторный запрос с валидаторами первого ответа."""
+        first = client.get(url)
+        return lambda: client.get(
+            url, HTTP_IF_NONE_MATCH=first['ETag'],
+            HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code
+
+    def test_not_modified(self):
+        """Без изменений страницы отвечают 304."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertEqual(self.revalidate(self.guest_client, url)(),
+                                 304)
+
+    def test_changes_invalidate(self):
+        """Новые посты и комментарии меняют ETag."""
+        changes = (
+            lambda: Post.objects.create(author=self.user, group=self.group,
+                                        text='Новый пост'),
+            lambda: Comment.objects.create(post=self.post, author=self.reader,
+                                           text='Комментарий'),
+        )
+        for change in changes:
+            checks = [self.revalidate(self.guest_client, url)
+                      for url in self.urls]
+            change()
+            for url, check in zip(self.urls, checks):
+                with self.subTest(url=url):
+                    self.assertEqual(check(), 200)
+
+    def test_viewer_in_etag(self):
+        """ETag у гостя и пользователя разный, подписка его меняет."""
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        self.assertNotEqual(self.guest_client.get(url)['ETag'],
+                            self.reader_client.get(url)['ETag'])
+        check = self.revalidate(self.reader_client, url)
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.assertEqual(check(), 200)
+        response = self.reader_client.get(url)
+        self.assertTrue(response.context['following'])
+
+    def test_csrf_token_in_etag(self):
+        """Новый CSRF-токен (повторный вход) не даёт 304 со старой формой."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.reader_client.get(url)
+        check = self.revalidate(self.reader_client, url)
+        self.assertEqual(check(), 304)
+        self.reader_client.cookies[settings.CSRF_COOKIE_NAME] = (
+            _get_new_csrf_token())
+        self.assertEqual(check(), 200)
+
+    def test_missing_object(self):
+        """Для несуществующих объектов остаётся 404."""
+        for url in (reverse('posts:group_list', kwargs={'slug': 'none'}),
+                    reverse('posts:post_detail', kwargs={'post_id': 999})):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertFalse(response.has_header('ETag'))
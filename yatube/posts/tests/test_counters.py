@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.follows import follow_many, unfollow_many
+from posts.models import AuthorStats, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test_group')
+        cls.group2 = Group.objects.create(title='Тестовая группа 2',
+                                          slug='test_group2')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assertCounts(self, author, group, group2):
+        self.assertEqual(AuthorStats.objects.get(user=self.user).posts_count,
+                         author)
+        self.group.refresh_from_db()
+        self.group2.refresh_from_db()
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(self.group2.posts_count, group2)
+
+    def test_post_counters(self):
+        """Счётчики постов следуют за созданием, переносом и удалением."""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Тестовый текст', 'group': self.group.id})
+        post = Post.objects.get(text='Тестовый текст')
+        self.assertCounts(1, 1, 0)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            data={'text': 'Тестовый текст', 'group': self.group2.id})
+        self.assertCounts(1, 0, 1)
+        post.refresh_from_db()
+        post.delete()
+        self.assertCounts(0, 0, 0)
+
+    def test_comment_counter(self):
+        """Счётчик комментариев поста."""
+        post = Post.objects.create(text='Тестовый текст', author=self.user)
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.id}),
+            data={'text': 'Тестовый коммент'})
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.all().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_followers_counter(self):
+        """Счётчик подписчиков следует за подписками, в том числе пакетными."""
+        readers = [User.objects.create_user(username=f'reader{i}')
+                   for i in range(3)]
+        Follow.objects.create(user=readers[0], author=self.user)
+        follow_many(readers[1], ['auth'])
+        follow_many(readers[2], ['auth'])
+        stats = AuthorStats.objects.get(user=self.user)
+        self.assertEqual(stats.followers_count, 3)
+        Follow.objects.get(user=readers[0]).delete()
+        unfollow_many(readers[1], ['auth'])
+        stats.refresh_from_db()
+        self.assertEqual(stats.followers_count, 1)
+
+    def test_reconcile_command(self):
+        """Команда исправляет счётчики после записей в обход сигналов."""
+        post = Post.objects.create(text='Тестовый текст', author=self.user)
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user, group=self.group)
+            for i in range(3))
+        Comment.objects.bulk_create(
+            Comment(text=f'Коммент {i}', author=self.user, post=post)
+            for i in range(2))
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn('groups: исправлено 1', out.getvalue())
+        self.assertCounts(4, 3, 0)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
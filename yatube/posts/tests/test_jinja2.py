@@ -0,0 +1,109 @@
+import re
+from importlib.util import find_spec
+from unittest import skipUnless
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import engines
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.benchmark import FEED_VIEWS
+from posts.models import Follow, Group, Post, User
+
+JINJA2_FEEDS = dict.fromkeys(FEED_VIEWS, 'jinja2')
+
+
+def normalize(html):
+    """Разметка без различий в пробелах между движками."""
+    return re.sub(r'\s+', ' ', html).strip()
+
+
+@skipUnless(find_spec('jinja2'), 'Jinja2 не установлен')
+class Jinja2FeedEquivalenceTest(TestCase):
+    """Ленты на Jinja2 выдают ту же разметку, что и на шаблонах Django."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='auth', first_name='Имя', last_name='Фамилия')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.group = Group.objects.create(
+            title='Группа <b>', slug='group', description='Описание & c')
+        Post.objects.bulk_create(
+            Post(text=f'Пост <i>{i}</i>\nвторая строка', author=cls.author,
+                 group=cls.group if i % 2 else None,
+                 thumbnail=f'/media/thumbs/{i}' if i % 3 else '')
+            for i in range(settings.POST_LIST + 3))
+        Group.objects.update(posts_count=Post.objects.count())
+
+    def render(self, client, url, feeds):
+        cache.clear()
+        with override_settings(FEED_TEMPLATE_ENGINES=feeds):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # Тестовый клиент видит только шаблоны Django.
+        self.assertEqual(not response.templates, bool(feeds))
+        return normalize(response.content.decode())
+
+    def assert_equivalent(self, client):
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+        ]
+        cache.clear()
+        page_obj = client.get(reverse('posts:index')).context['page_obj']
+        urls.append(reverse('posts:index') + '?' + urlencode(
+            {'cursor': page_obj.next_cursor}))
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.render(client, url, JINJA2_FEEDS),
+                                 self.render(client, url, {}))
+
+    def test_guest(self):
+        self.assert_equivalent(Client())
+
+    def test_authorized(self):
+        client = Client()
+        client.force_login(self.reader)
+        self.assert_equivalent(client)
+        url = reverse('posts:follow_index')
+        self.assertEqual(self.render(client, url, JINJA2_FEEDS),
+                         self.render(client, url, {}))
+
+    def test_author_profile(self):
+        """Автор не видит кнопки подписки на себя на обоих движках."""
+        client = Client()
+        client.force_login(self.author)
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        html = self.render(client, url, JINJA2_FEEDS)
+        self.assertEqual(html, self.render(client, url, {}))
+        self.assertNotIn('Подписаться', html)
+
+    def test_fragment_cached(self):
+        """Фрагмент ленты Jinja2 берётся из кеша до смены версии."""
+        cache.clear()
+        with override_settings(FEED_TEMPLATE_ENGINES=JINJA2_FEEDS):
+            Client().get(reverse('posts:index'))
+            Post.objects.filter(text__startswith='Пост').update(
+                text='Изменено без сброса')
+            client = Client()
+            client.force_login(self.reader)
+            response = client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'Изменено без сброса')
+
+    def test_helpers(self):
+        """url и date ведут себя как теги и фильтры Django."""
+        template = engines['jinja2'].from_string(
+            "{{ url('posts:profile', 'auth') }} "
+            "{{ post.pub_date|date('d E Y') }}")
+        post = Post.objects.first()
+        django_template = engines['django'].from_string(
+            "{% url 'posts:profile' 'auth' %} "
+            "{{ post.pub_date|date:'d E Y' }}")
+        self.assertEqual(template.render({'post': post}),
+                         django_template.render({'post': post}))
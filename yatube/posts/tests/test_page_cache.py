@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Group, Post, User
+
+
+class AnonymousPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.post = Post.objects.create(text='Первый пост', author=self.author,
+                                        group=self.group)
+        self.guest_client = Client()
+
+    def test_guest_page_cached(self):
+        """Повторный запрос гостя не трогает базу и несёт ключи прокси."""
+        url = reverse('posts:group_list', kwargs={'slug': 'group'})
+        self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertContains(response, 'Первый пост')
+        self.assertEqual(response['Surrogate-Key'],
+                         f'all group:{self.group.pk}')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_invalidated_by_bump(self):
+        """Изменения лент и комментарии сбрасывают страницы."""
+        index = reverse('posts:index')
+        detail = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.guest_client.get(index)
+        self.guest_client.get(detail)
+        Post.objects.create(text='Второй пост', author=self.author)
+        Comment.objects.create(text='Комментарий', post=self.post,
+                               author=self.author)
+        self.assertContains(self.guest_client.get(index), 'Второй пост')
+        self.assertContains(self.guest_client.get(detail), 'Комментарий')
+
+    def test_authorized_bypass(self):
+        """Вошедший пользователь не получает страницу гостя."""
+        client = Client()
+        client.force_login(self.author)
+        self.guest_client.get(reverse('posts:index'))
+        response = client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Surrogate-Key'))
+        self.assertContains(response, 'Пользователь: auth')
+
+    @override_settings(EDGE_PURGE_URL='http://edge.test/purge')
+    def test_edge_purge(self):
+        """После записи прокси получает сброс по именам лент."""
+        with mock.patch('posts.edge.urlopen') as urlopen, mock.patch(
+                'posts.edge.transaction.on_commit', lambda func: func()):
+            self.post.text = 'Правка'
+            self.post.save()
+        request = urlopen.call_args[0][0]
+        self.assertEqual(request.get_header('Surrogate-key'),
+                         f'index profile:{self.author.pk} '
+                         f'group:{self.group.pk}')
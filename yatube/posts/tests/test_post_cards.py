@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.cache import bump_feeds
+from posts.models import Post
+from posts.templatetags.post_cards import card_key, post_cards
+
+User = get_user_model()
+
+CARD = 'posts/includes/cards/profile.html'
+
+
+class PostCardsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(text='Тестовый текст', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.post.refresh_from_db()
+
+    def card_key(self, post):
+        return card_key(Post.objects.for_feed().get(pk=post.pk), CARD)
+
+    def test_first_render_fills_cache(self):
+        """Карточка рендерится один раз и дальше берётся из кеша."""
+        [(post, card)] = post_cards(Post.objects.for_feed(), CARD)
+        self.assertEqual(cache.get(self.card_key(self.post)), card)
+        cache.set(self.card_key(self.post), 'из кеша')
+        [(post, card)] = post_cards(Post.objects.for_feed(), CARD)
+        self.assertEqual(card, 'из кеша')
+
+    def test_edit_bumps_version(self):
+        """Правка поста даёт новую версию и новую карточку."""
+        version = self.post.version
+        client = Client()
+        client.force_login(self.user)
+        client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст'})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.version, version + 1)
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, 'Новый текст')
+        self.assertNotContains(response, 'Тестовый текст')
+
+    def test_edit_keeps_concurrent_thumbnail(self):
+        """Превью, записанное во время правки, не теряется."""
+        version = self.post.version
+        stale = Post.objects.get(pk=self.post.pk)
+        Post.objects.filter(pk=self.post.pk).update(
+            thumbnail='/media/thumbs/1', version=F('version') + 1)
+        stale.text = 'Новый текст'
+        stale.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.thumbnail, '/media/thumbs/1')
+        self.assertEqual(self.post.version, version + 2)
+        self.assertEqual(stale.version, version + 2)
+        self.assertEqual(self.post.text, 'Новый текст')
+
+    def test_feed_assembles_cached_cards(self):
+        """Сброшенная лента собирается из готовых карточек."""
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        Client().get(url)
+        cache.set(self.card_key(self.post), 'из кеша')
+        bump_feeds(f'profile:{self.user.pk}')
+        response = Client().get(url)
+        self.assertContains(response, 'из кеша')
+        self.assertNotContains(response, 'Тестовый текст')
+
+    def test_author_rename(self):
+        """Новое имя автора сразу видно в карточках лент."""
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        Client().get(url)
+        self.user.first_name = 'Новое'
+        self.user.last_name = 'Имя'
+        self.user.save()
+        self.assertContains(Client().get(url), 'Автор: Новое Имя')
@@ -0,0 +1,32 @@
+import os
+import tempfile
+from io import StringIO
+
+from core.precompile import compile_templates
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+from posts.benchmark import template_settings
+
+
+class CompileTemplatesTest(SimpleTestCase):
+    def test_all_templates_compile(self):
+        """Все шаблоны проекта разбираются без ошибок."""
+        out = StringIO()
+        call_command('compile_templates', stdout=out)
+        compiled, errors = compile_templates()
+        self.assertEqual(errors, [])
+        self.assertIn(f'Шаблонов разобрано: {compiled}', out.getvalue())
+
+    def test_syntax_error_fails(self):
+        """Синтаксическая ошибка в шаблоне роняет команду."""
+        with tempfile.TemporaryDirectory(dir=settings.BASE_DIR) as directory:
+            with open(os.path.join(directory, 'broken.html'), 'w') as file:
+                file.write('{% if %}')
+            templates = template_settings(cached=True)
+            templates[0]['DIRS'] = [directory]
+            with override_settings(TEMPLATES=templates):
+                with self.assertRaisesMessage(CommandError,
+                                              'Шаблонов с ошибками: 1'):
+                    call_command('compile_templates', stdout=StringIO(),
+                                 stderr=StringIO())
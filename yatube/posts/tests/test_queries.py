@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedQueryBudgetTest(TestCase):
+    """Число запросов ленты не зависит от числа постов на странице."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test_group')
+        for i in range(settings.POST_LIST + 1):
+            author = User.objects.create_user(
+                username=f'author{i}', first_name='Имя', last_name=str(i))
+            group = Group.objects.create(title=f'Группа {i}',
+                                         slug=f'group{i}')
+            Post.objects.create(text=f'Тестовый текст {i}',
+                                author=author, group=group)
+            Follow.objects.create(user=cls.reader, author=author)
+        cls.author = User.objects.get(username='author0')
+        Post.objects.bulk_create(
+            Post(text=f'Пост группы {i}', author=cls.author, group=cls.group)
+            for i in range(settings.POST_LIST + 1))
+        cls.post = Post.objects.filter(author=cls.author).first()
+        Comment.objects.bulk_create(
+            Comment(text=f'Комментарий {i}', post=cls.post,
+                    author=User.objects.get(username=f'author{i}'))
+            for i in range(settings.POST_LIST))
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+        cache.clear()
+
+    def test_guest_query_budget(self):
+        """Бюджет запросов страниц для гостя.
+
+        Группа, профиль и пост тратят один запрос по ключу на валидатор
+        ETag до построения страницы. Пост читает комментарии страницы
+        и ответы в их ветках двумя запросами.
+        """
+        budgets = {
+            reverse('posts:index'): 1,
+            reverse('posts:index') + '?page=2': 2,
+            reverse('posts:group_list',
+                    kwargs={'slug': self.group.slug}): 3,
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}): 3,
+            reverse('posts:post_detail',
+                    kwargs={'post_id': self.post.id}): 4,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                cache.clear()
+                with self.assertNumQueries(budget):
+                    self.guest_client.get(url)
+
+    def test_not_modified_query_budget(self):
+        """Ответ 304 гостю отдаёт кеш страниц без запросов к базе."""
+        budgets = {
+            reverse('posts:index'): 0,
+            reverse('posts:group_list',
+                    kwargs={'slug': self.group.slug}): 0,
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}): 0,
+            reverse('posts:post_detail',
+                    kwargs={'post_id': self.post.id}): 0,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                with self.assertNumQueries(budget):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+
+    def test_follow_index_query_budget(self):
+        """Бюджет запросов ленты подписок: на тёплом кеше — только лента.
+
+        На холодном кеше добавляются сессия, пользователь и поиск авторов
+        без рассылки.
+        """
+        for budget in (4, 1):
+            with self.subTest(budget=budget):
+                with self.assertNumQueries(budget):
+                    response = self.authorized_client.get(
+                        reverse('posts:follow_index'))
+                self.assertEqual(len(response.context['page_obj']),
+                                 settings.POST_LIST)
@@ -0,0 +1,80 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BAD_PLAN_STEPS = ('USE TEMP B-TREE',)
+
+
+def bad_steps(sql):
+    """Шаги плана с полным сканированием таблицы или сортировкой."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        steps = [row[-1] for row in cursor.fetchall()]
+    return [
+        step for step in steps
+        if step.startswith(BAD_PLAN_STEPS)
+        or (step.startswith('SCAN') and 'INDEX' not in step)
+    ]
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть в SQLite')
+class QueryPlanTest(TestCase):
+    """Запросы страниц используют индексы без полного сканирования."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test_group')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for i in range(settings.POST_LIST + 1):
+            Post.objects.create(text=f'Тестовый текст {i}',
+                                author=cls.author, group=cls.group)
+        cls.post = Post.objects.first()
+        Comment.objects.create(text='Комментарий', post=cls.post,
+                               author=cls.user)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def check_plans(self, url):
+        self.authorized_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(url)
+        for query in queries.captured_queries:
+            if query['sql'].startswith('SELECT'):
+                with self.subTest(url=url, sql=query['sql']):
+                    self.assertEqual(bad_steps(query['sql']), [])
+        return response
+
+    def test_feed_plans(self):
+        """Ленты и их вторые страницы по курсору."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            response = self.check_plans(url)
+            cursor = response.context['page_obj'].next_cursor
+            self.check_plans(f'{url}?cursor={cursor}')
+
+    def test_post_detail_plan(self):
+        """Страница поста с комментариями."""
+        self.check_plans(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}))
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from core.middleware import ReplicaPinMiddleware
+from posts.cache import ALL_FEEDS, VERSION_KEY, bump_feeds, feed_condition
+from posts.models import Follow, Post
+
+
+@override_settings(REPLICA_DATABASES=['replica0'])
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def route(self, request, write=False):
+        """Базы, выбранные роутером для чтения до и после записи."""
+        chosen = []
+
+        def view(request):
+            chosen.append(router.db_for_read(Post))
+            if write:
+                router.db_for_write(Follow)
+                chosen.append(router.db_for_read(Post))
+            return HttpResponse()
+        response = ReplicaPinMiddleware(view)(request)
+        return chosen, response
+
+    def test_get_reads_from_replica(self):
+        """GET читает с реплики и не закрепляет primary."""
+        chosen, response = self.route(self.factory.get('/'))
+        self.assertEqual(chosen, ['replica0'])
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_write_pins_primary(self):
+        """После записи запрос и следующие запросы читают из primary."""
+        chosen, response = self.route(self.factory.get('/follow/'),
+                                      write=True)
+        self.assertEqual(chosen, ['replica0', 'default'])
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_PIN_SECONDS)
+        request = self.factory.get('/')
+        request.COOKIES[settings.REPLICA_PIN_COOKIE] = cookie.value
+        self.assertEqual(self.route(request)[0], ['default'])
+
+    def test_post_and_background_use_primary(self):
+        """POST и код вне запроса не читают с реплик."""
+        self.assertEqual(self.route(self.factory.post('/'))[0], ['default'])
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_no_migrations_on_replicas(self):
+        """migrate не трогает реплики."""
+        self.assertFalse(router.allow_migrate('replica0', 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
+
+    def test_fresh_feed_reads_primary(self):
+        """Гость читает ленту, сброшенную только что, из primary."""
+        @feed_condition(lambda request: ['index'])
+        def view(request):
+            chosen.append(router.db_for_read(Post))
+            return HttpResponse()
+
+        chosen = []
+        cache.clear()
+        old = time.time_ns() - (settings.REPLICA_PIN_SECONDS + 1) * 10 ** 9
+        cache.set_many({VERSION_KEY.format(name): old
+                        for name in (ALL_FEEDS, 'index')})
+        for _ in range(2):
+            request = self.factory.get('/')
+            request.user = AnonymousUser()
+            ReplicaPinMiddleware(view)(request)
+            bump_feeds('index')
+        self.assertEqual(chosen, ['replica0', 'default'])
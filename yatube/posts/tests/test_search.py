@@ -0,0 +1,113 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post, User
+from posts.search import LikeBackend, backend
+from posts.stemmer import stem
+
+
+class StemmerTest(TestCase):
+    def test_stem(self):
+        """Формы слова сводятся к одной основе."""
+        cases = {
+            'программы': 'программ',
+            'программа': 'программ',
+            'котов': 'кот',
+            'котики': 'котик',
+            'красивейший': 'красив',
+            'сказала': 'сказа',
+            'нежность': 'нежност',
+            'Ёлки': 'елк',
+        }
+        for word, expected in cases.items():
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), expected)
+
+
+@override_settings(POST_LIST=2)
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        texts = (
+            'Программа на Python',
+            'Пишу программы и программы для программ',
+            'Про котов',
+            'Программист любит котиков',
+        )
+        cls.pks = [Post.objects.create(author=cls.user, text=text).pk
+                   for text in texts]
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, cursor=None):
+        params = {'q': query}
+        if cursor:
+            params['cursor'] = cursor
+        return self.guest_client.get(reverse('posts:search'), params)
+
+    def found(self, query):
+        return [pk for pk, _ in backend().search(query, limit=10)]
+
+    def test_stemmed_and_ranked(self):
+        """Ищутся все формы слова, частые совпадения выше."""
+        self.assertEqual(self.found('программой'),
+                         [self.pks[1], self.pks[0]])
+
+    def test_prefix(self):
+        """Запрос со звёздочкой ищет по началу слова."""
+        self.assertEqual(set(self.found('прогр*')),
+                         {self.pks[0], self.pks[1],
+                          self.pks[3]})
+        self.assertEqual(self.found('кот'), [self.pks[2]])
+
+    def test_prefix_full_word(self):
+        """Целое слово со звёздочкой находит свои формы."""
+        post = Post.objects.create(author=self.user,
+                                   text='Учу программирование')
+        self.assertEqual(self.found('программирование*'), [post.pk])
+        self.assertEqual(self.found('Программирование'), [post.pk])
+
+    def test_keyset_pages(self):
+        """Страницы выдачи идут по курсору без повторов."""
+        first = self.search('прогр*').context['page_obj']
+        self.assertTrue(first.next_cursor)
+        second = self.search('прогр*', first.next_cursor).context['page_obj']
+        self.assertIsNone(second.next_cursor)
+        pks = [post.pk for post in [*first, *second]]
+        self.assertEqual(pks, self.found('прогр*'))
+        self.assertContains(self.search('прогр*'), 'q=%D0%BF')
+
+    def test_index_follows_posts(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=self.pks[2])
+        post.text = 'Про собак'
+        post.save()
+        self.assertEqual(self.found('кот'), [])
+        self.assertEqual(self.found('собака'), [post.pk])
+        post.delete()
+        self.assertEqual(self.found('собака'), [])
+
+    def test_empty_and_syntax(self):
+        """Пустой запрос и спецсимволы FTS не ломают страницу."""
+        for query in ('', '"', 'NOT', '* OR ('):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query).status_code, 200)
+
+    def test_like_backend(self):
+        """Запасной бэкенд находит те же посты, новые сверху."""
+        self.assertEqual(
+            [pk for pk, _ in LikeBackend().search('коты')],
+            [self.pks[3], self.pks[2]])
+
+    def test_admin_search(self):
+        """Поиск в админке идёт через тот же индекс."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        self.guest_client.force_login(admin)
+        response = self.guest_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'кот*'})
+        self.assertEqual(
+            {post.pk for post in response.context['cl'].result_list},
+            {self.pks[2], self.pks[3]})
@@ -0,0 +1,62 @@
+import os
+import tempfile
+from io import StringIO
+
+from core.sqlite.base import DatabaseWrapper, writer_lock
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+
+
+class SqliteBackendTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = dict(connections['default'].settings_dict)
+        settings_dict['NAME'] = os.path.join(directory.name, 'db.sqlite3')
+        settings_dict['OPTIONS'] = {'pragmas': settings.SQLITE_PRAGMAS,
+                                    'immediate': True, 'timeout': 1}
+        self.connection = DatabaseWrapper(settings_dict)
+        self.addCleanup(self.connection.close)
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """Прагмы выполняются на каждом новом соединении."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('cache_size'), -65536)
+
+    def test_writer_lock_released(self):
+        """Замок писателя держится только на время транзакции."""
+        lock = writer_lock(self.connection.settings_dict['NAME'])
+        self.connection.set_autocommit(
+            False, force_begin_transaction_with_broken_autocommit=True)
+        self.assertTrue(self.connection.holds_writer)
+        self.assertFalse(lock.acquire(blocking=False))
+        self.connection.commit()
+        self.assertFalse(self.connection.holds_writer)
+        self.assertTrue(lock.acquire(blocking=False))
+        lock.release()
+
+
+class SqliteCommandsTest(TransactionTestCase):
+    def test_maintenance(self):
+        """Checkpoint и ANALYZE выполняются и печатают время."""
+        out = StringIO()
+        call_command('sqlite_maintenance', 'checkpoint', 'analyze',
+                     stdout=out)
+        self.assertIn('checkpoint', out.getvalue())
+        self.assertIn('analyze', out.getvalue())
+
+    def test_benchmark(self):
+        """Бенчмарк сравнивает оба профиля."""
+        out = StringIO()
+        call_command('sqlite_benchmark', readers=1, writers=1,
+                     seconds=0.2, rows=100, stdout=out)
+        self.assertIn('default', out.getvalue())
+        self.assertIn('production', out.getvalue())
@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from posts.models import Post
+from posts.thumbnails import RENDITIONS, generate_thumbnails
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(name='big.png', size=(100, 50)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(),
+                              content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый текст', author=self.user, image=image_file())
+
+    def test_generate_renditions(self):
+        """Генерируются все варианты, URL сохраняется в посте."""
+        url = generate_thumbnails(self.post.pk, self.post.image.name)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.thumbnail, url)
+        prefix = url[len(settings.MEDIA_URL):]
+        width, height = settings.THUMBNAIL_SIZE
+        for suffix, scale, image_format in RENDITIONS:
+            with self.subTest(suffix=suffix):
+                with default_storage.open(prefix + suffix) as thumb:
+                    image = Image.open(thumb)
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.size,
+                                     (width * scale, height * scale))
+
+    def test_feed_uses_precomputed_urls(self):
+        """Лента выводит готовые превью, а до их генерации оригинал."""
+        url = reverse('posts:profile', kwargs={'username': 'auth'})
+        response = Client().get(url)
+        self.assertContains(response, self.post.image.url)
+        self.assertNotContains(response, '<picture>')
+        thumb = generate_thumbnails(self.post.pk, self.post.image.name)
+        response = Client().get(url)
+        self.assertContains(response, f'{thumb}.webp 1x')
+        self.assertContains(response, f'{thumb}@2x.jpg 2x')
+
+    def test_regenerate_overwrites(self):
+        """Повторная генерация заменяет файлы под теми же именами."""
+        url = generate_thumbnails(self.post.pk, self.post.image.name)
+        self.assertEqual(
+            generate_thumbnails(self.post.pk, self.post.image.name), url)
+        prefix = url[len(settings.MEDIA_URL):]
+        directory, name = prefix.rsplit('/', 1)
+        files = [file for file in default_storage.listdir(directory)[1]
+                 if file.startswith(name)]
+        self.assertEqual(sorted(files),
+                         sorted(name + suffix for suffix, _, _ in RENDITIONS))
+
+    def test_new_image_resets_thumbnail(self):
+        """Замена картинки сбрасывает устаревшие превью."""
+        generate_thumbnails(self.post.pk, self.post.image.name)
+        post = Post.objects.get(pk=self.post.pk)
+        post.image = image_file('other.png')
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnail, '')
+
+    def test_missing_image(self):
+        """Отсутствующий файл не ломает генерацию."""
+        self.assertIsNone(generate_thumbnails(self.post.pk, 'posts/no.png'))
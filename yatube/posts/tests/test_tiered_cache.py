@@ -0,0 +1,104 @@
+import threading
+import time
+
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase
+from core.cache import TieredCache
+
+
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.shared = caches['shared']
+        self.tiered = TieredCache('shared', {'OPTIONS': {
+            'L1_TIMEOUT': 60,
+            'SHARED_ONLY': ('feed:version:',),
+            'SINGLE_FLIGHT': ('template.cache.',),
+            'LOCK_WAIT': 0.3,
+        }})
+
+    def test_l1_in_front_of_shared(self):
+        """Повторное чтение идёт из L1, версии — всегда из L2."""
+        self.tiered.set('card', 'карточка')
+        self.tiered.set('feed:version:index', 1)
+        self.shared.delete('card')
+        self.shared.set('feed:version:index', (2, None, 0))
+        self.assertEqual(self.tiered.get('card'), 'карточка')
+        self.assertEqual(self.tiered.get('feed:version:index'), 2)
+        self.assertEqual(
+            self.tiered.get_many(['card', 'feed:version:index']),
+            {'card': 'карточка', 'feed:version:index': 2})
+
+    def test_l1_shared_between_threads(self):
+        """Потоки процесса видят один L1."""
+        other = TieredCache('shared', {'OPTIONS': {'L1_TIMEOUT': 60}})
+        self.tiered.set('card', 'карточка')
+        self.shared.delete('card')
+        self.assertEqual(other.get('card'), 'карточка')
+        other.delete('card')
+        self.assertIsNone(self.tiered.get('card'))
+
+    def test_single_flight_waits_for_holder(self):
+        """Пока блокировка занята, промах ждёт значение из L2."""
+        self.assertIsNone(self.tiered.get('template.cache.feed'))
+        other = TieredCache('shared', {'OPTIONS': {
+            'SINGLE_FLIGHT': ('template.cache.',), 'LOCK_WAIT': 0.3}})
+        timer = threading.Timer(
+            0.1, self.tiered.set, ('template.cache.feed', 'html'))
+        timer.start()
+        self.assertEqual(other.get('template.cache.feed'), 'html')
+        timer.join()
+        self.assertTrue(self.tiered._acquire('template.cache.feed', None))
+
+    def test_single_flight_gives_up(self):
+        """Держатель не успел — ожидающий считает значение сам."""
+        self.assertIsNone(self.tiered.get('template.cache.feed'))
+        started = time.monotonic()
+        self.assertEqual(self.tiered.get('template.cache.feed', 'нет'), 'нет')
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+
+    def test_lock_is_exclusive(self):
+        """Из нескольких потоков блокировку берёт ровно один."""
+        results = []
+        barrier = threading.Barrier(8)
+
+        def acquire():
+            other = TieredCache('shared', {'OPTIONS': {}})
+            barrier.wait()
+            results.append(other._acquire('template.cache.feed', None))
+
+        threads = [threading.Thread(target=acquire) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 1)
+
+    def test_add_keeps_first(self):
+        """add() из разных потоков записывает ровно одно значение."""
+        results = []
+        barrier = threading.Barrier(8)
+
+        def add(value):
+            other = TieredCache('shared', {'OPTIONS': {}})
+            barrier.wait()
+            if other.add('feed:version:index', value, None):
+                results.append(value)
+
+        threads = [threading.Thread(target=add, args=(value,))
+                   for value in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 1)
+        self.assertEqual(self.tiered.get('feed:version:index'), results[0])
+        self.assertFalse(self.tiered.add('feed:version:index', 99))
+
+    def test_early_refresh(self):
+        """Перед истечением пересчитывает только один процесс."""
+        self.shared.set('card', ('карточка', time.time() + 1, 3600))
+        self.assertIsNone(self.tiered.get('card'))
+        self.assertEqual(self.tiered.get('card'), 'карточка')
+        self.tiered.set('card', 'новая', 60)
+        self.assertEqual(self.tiered.get('card'), 'новая')
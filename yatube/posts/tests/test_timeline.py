@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+        cache.clear()
+
+    def follow_feed(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_fan_out_on_create(self):
+        """Новый пост попадает в ленты подписчиков."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
+        self.assertEqual(self.follow_feed(), [post])
+
+    def test_backfill_and_remove_on_follow(self):
+        """Подписка дозаполняет ленту, отписка её очищает."""
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'author'}))
+        self.assertEqual(self.follow_feed(), [post])
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': 'author'}))
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.follow_feed(), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_pull_mode_author(self):
+        """Посты популярного автора подтягиваются при чтении ленты."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        cache.clear()
+        old_post = Post.objects.create(text='Старый пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.follow_feed(), [old_post])
+        new_post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(self.follow_feed(), [new_post, old_post])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_pull_mode_read_only(self):
+        """Чтение ленты с авторами без рассылки ничего не пишет."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text='Тестовый текст', author=self.author)
+        self.follow_feed()
+        with CaptureQueriesContext(connection) as queries:
+            self.follow_feed()
+        self.assertFalse([
+            query['sql'] for query in queries.captured_queries
+            if not query['sql'].startswith('SELECT')])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_pull_to_push(self):
+        """Посты, написанные без рассылки, остаются в ленте после отписки."""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.create(user=other, author=self.author)
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.follow_feed(), [post])
+        Follow.objects.get(user=other).delete()
+        self.assertEqual(self.follow_feed(), [post])
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=post).exists())
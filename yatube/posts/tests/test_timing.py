@@ -0,0 +1,84 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from core.middleware import fingerprint
+from posts.models import Post, User
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0, REQUEST_TIMING_SLOW_MS=0,
+                   REQUEST_TIMING_TOKEN='secret')
+class RequestTimingTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get_record(self, url, client=None, **headers):
+        with self.assertLogs('yatube.timing') as logs:
+            response = (client or self.guest_client).get(url, **headers)
+        return response, json.loads(logs.records[-1].getMessage())
+
+    def test_server_timing(self):
+        """Заголовок и лог содержат SQL, шаблоны и кеш."""
+        response, record = self.get_record(
+            reverse('posts:index'), HTTP_X_REQUEST_TIMING='secret')
+        metrics = [part.split(';')[0]
+                   for part in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics, ['sql', 'tpl', 'cache', 'total'])
+        self.assertEqual(record['path'], reverse('posts:index'))
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertGreater(record['cache_misses'], 0)
+        response, warm = self.get_record(
+            reverse('posts:index'), HTTP_X_REQUEST_TIMING='secret')
+        self.assertGreater(warm['cache_hits'], record['cache_hits'])
+        self.assertLess(warm['cache_misses'], record['cache_misses'])
+        self.assertIn(f'hit={warm["cache_hits"]} ', response['Server-Timing'])
+
+    def test_header_hidden(self):
+        """Случайная выборка пишет лог, но заголовок гостю не отдаёт."""
+        for token in ('', 'wrong'):
+            with self.subTest(token=token):
+                cache.clear()
+                response, record = self.get_record(
+                    reverse('posts:index'), HTTP_X_REQUEST_TIMING=token)
+                self.assertFalse(response.has_header('Server-Timing'))
+                self.assertGreater(record['queries'], 0)
+
+    def test_staff(self):
+        """Сотрудник видит Server-Timing без токена."""
+        client = Client()
+        client.force_login(User.objects.create_user(
+            username='staff', is_staff=True))
+        response, _ = self.get_record(reverse('posts:index'), client)
+        self.assertTrue(response.has_header('Server-Timing'))
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0)
+    def test_not_sampled(self):
+        """Без выборки замер не включается, медленный запрос в логе."""
+        response, record = self.get_record(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertIs(record['sampled'], False)
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0)
+    def test_token(self):
+        """Заголовок с токеном включает замер для одного запроса."""
+        response, _ = self.get_record(
+            reverse('posts:index'), HTTP_X_REQUEST_TIMING='secret')
+        self.assertTrue(response.has_header('Server-Timing'))
+
+    def test_fingerprint(self):
+        """Отпечаток не зависит от значений и длины списков IN."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND s = 'a'"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) "
+                        "AND s = 'b'"))
+        self.assertEqual(fingerprint('SELECT * FROM t0 LIMIT 21'),
+                         'SELECT * FROM t0 LIMIT %s')
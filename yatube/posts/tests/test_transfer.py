@@ -0,0 +1,89 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TransferCommandsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Тестовая группа',
+                                         slug='test_group',
+                                         description='Описание')
+        cls.post = Post.objects.create(text='Тестовый текст',
+                                       author=cls.user, group=cls.group)
+        Post.objects.create(text='Без группы', author=cls.user)
+        root = Comment.objects.create(text='Комментарий', post=cls.post,
+                                      author=cls.reader)
+        Comment.objects.create(text='Ответ', post=cls.post, author=cls.user,
+                               parent=root)
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def snapshot(self):
+        return {
+            'posts': list(Post.objects.order_by('pk').values_list(
+                'pk', 'text', 'pub_date', 'author__username', 'group__slug',
+                'comments_count')),
+            'comments': list(Comment.objects.order_by('pk').values_list(
+                'pk', 'parent_id', 'path', 'post_id', 'text', 'created',
+                'author__username')),
+            'follows': list(Follow.objects.values_list(
+                'user__username', 'author__username')),
+        }
+
+    def test_round_trip(self):
+        """Выгрузка и загрузка сохраняют данные, даты и авторов."""
+        before = self.snapshot()
+        call_command('export_posts', self.path, stderr=StringIO())
+        Post.objects.all().delete()
+        Group.objects.all().delete()
+        Comment.objects.all().delete()
+        User.objects.all().delete()
+        out = StringIO()
+        call_command('import_posts', self.path, stdout=out)
+        self.assertEqual(self.snapshot(), before)
+        self.assertIn('post: 2', out.getvalue())
+        self.assertIn('строк/с', out.getvalue())
+        self.assertEqual(TimelineEntry.objects.count(), 2)
+        self.assertFalse(User.objects.get(
+            username='reader').has_usable_password())
+
+    def test_import_into_filled_database(self):
+        """Загрузка поверх данных получает новые id и не трогает старые."""
+        call_command('export_posts', self.path, stderr=StringIO())
+        last = Post.objects.order_by('-pk').values_list('pk', flat=True)[0]
+        call_command('import_posts', self.path, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).text,
+                         'Тестовый текст')
+        copy = Post.objects.get(pk=self.post.pk + last)
+        self.assertEqual(copy.text, 'Тестовый текст')
+        root = copy.comments.get(parent=None)
+        self.assertEqual(root.text, 'Комментарий')
+        self.assertEqual(
+            list(Comment.objects.subtrees([root]).values_list(
+                'text', 'parent_id')), [('Ответ', root.pk)])
+        self.assertEqual(TimelineEntry.objects.count(), 4)
+
+    def test_broken_line(self):
+        """Испорченная строка прерывает загрузку с номером строки."""
+        with open(self.path, 'w') as file:
+            file.write('{"model": "group", "fields": {}}\nне json\n')
+        with self.assertRaisesMessage(CommandError, 'Строка 2'):
+            call_command('import_posts', self.path, stdout=StringIO())
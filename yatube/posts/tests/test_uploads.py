@@ -0,0 +1,109 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from posts.forms import PostForm
+from posts.models import Post
+from posts.thumbnails import generate_thumbnails
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(name='image.png', size=(100, 50)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(),
+                              content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageUploadTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def create(self, image):
+        return self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Тестовый текст', 'image': image})
+
+    def test_upload_saved(self):
+        """Картинка из формы создания сохраняется в посте."""
+        self.create(image_file('saved.png'))
+        self.assertTrue(
+            Post.objects.filter(image__startswith='posts/saved').exists())
+
+    @override_settings(POST_IMAGE_MAX_BYTES=100)
+    def test_too_many_bytes(self):
+        """Загрузка больше лимита отклоняется без создания поста."""
+        response = self.create(image_file())
+        self.assertIn('Файл больше',
+                      response.context['form'].errors['image'][0])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_BYTES=100)
+    def test_api_too_many_bytes(self):
+        """API отсекает загрузку обработчиком, не открывая её в Pillow."""
+        response = self.authorized_client.post(
+            reverse('api:posts'),
+            data={'text': 'Тестовый текст', 'image': SimpleUploadedFile(
+                'big.png', b'x' * 1000, content_type='image/png')})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Файл больше', response.json()['errors']['image'][0])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_too_many_pixels(self):
+        """Размеры из заголовка проверяются до сохранения."""
+        response = self.create(image_file())
+        self.assertFormError(response, 'form', 'image',
+                             'Картинка больше 100 пикселей')
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100)
+    def test_form_checks_files_without_handler(self):
+        """Форма проверяет и файлы, пришедшие в обход обработчика."""
+        form = PostForm(data={'text': 'Тестовый текст'},
+                        files={'image': image_file()})
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    @override_settings(POST_IMAGE_MAX_SIDE=50)
+    def test_oversized_original_shrunk(self):
+        """Большой оригинал пережимается при подготовке превью."""
+        post = Post.objects.create(text='Тестовый текст', author=self.user,
+                                   image=image_file())
+        generate_thumbnails(post.pk, post.image.name)
+        with default_storage.open(post.image.name) as original:
+            self.assertEqual(Image.open(original).size, (50, 25))
+        post.refresh_from_db()
+        self.assertEqual(default_storage.listdir('posts')[1].count(
+            post.image.name.split('/')[-1]), 1)
+
+    def test_csrf_still_checked(self):
+        """Свои обработчики загрузки не отключают проверку CSRF."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(reverse('posts:post_create'),
+                               data={'text': 'Тестовый текст'})
+        self.assertTemplateUsed(response, 'core/403csrf.html')
+        self.assertFalse(Post.objects.exists())
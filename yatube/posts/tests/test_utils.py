@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Post
+from posts.utils import KeysetPaginator, decode_cursor
+
+User = get_user_model()
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.posts_count = settings.POST_LIST * 2 + 5
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый текст {i}', author=cls.user)
+            for i in range(cls.posts_count))
+
+    def setUp(self):
+        self.paginator = KeysetPaginator(Post.objects.all(),
+                                         settings.POST_LIST)
+
+    def test_first_page_single_query(self):
+        """Первая страница строится одним запросом без COUNT."""
+        with self.assertNumQueries(1):
+            page = self.paginator.get_cursor_page()
+        self.assertEqual(len(page), settings.POST_LIST)
+        self.assertIsNone(page.previous_cursor)
+        self.assertIsNotNone(page.next_cursor)
+
+    def test_walk_forward_and_back(self):
+        """Проход вперёд и назад по курсорам возвращает все посты."""
+        pages = [self.paginator.get_cursor_page()]
+        while pages[-1].next_cursor:
+            pages.append(
+                self.paginator.get_cursor_page(pages[-1].next_cursor))
+        seen = [post.pk for page in pages for post in page]
+        expected = list(Post.objects.order_by(
+            '-pub_date', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages[-1]), self.posts_count % settings.POST_LIST)
+        previous = self.paginator.get_cursor_page(pages[-1].previous_cursor)
+        self.assertEqual(list(previous), list(pages[-2]))
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Испорченный курсор отдаёт первую страницу."""
+        self.assertIsNone(decode_cursor('не курсор'))
+        page = self.paginator.get_cursor_page('bm90fGN1cnNvcg==')
+        self.assertEqual(list(page), list(self.paginator.get_cursor_page()))
+
+    def test_page_number_compatibility(self):
+        """?page=N по-прежнему отдаёт нужную страницу."""
+        response = Client().get(reverse('posts:index') + '?page=3')
+        self.assertEqual(len(response.context['page_obj']),
+                         self.posts_count - settings.POST_LIST * 2)
+        self.assertEqual(response.context['page_obj'].number, 3)
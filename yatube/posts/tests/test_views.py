@@ -114,20 +114,48 @@ class ViewsTest(TestCase):
         self.check_post_info(response.context['post'])
 
     def test_cache_index_page(self):
-        """Проверка работы кеша"""
+        """Кеш ленты сбрасывается при изменении постов"""
         post = Post.objects.create(
             text='Пост под кеш',
             author=self.user)
         content_add = self.authorized_client.get(
             reverse('posts:index')).content
+        self.assertEqual(
+            content_add,
+            self.authorized_client.get(reverse('posts:index')).content)
         post.delete()
         content_delete = self.authorized_client.get(
             reverse('posts:index')).content
-        self.assertEqual(content_add, content_delete)
-        cache.clear()
-        content_cache_clear = self.authorized_client.get(
-            reverse('posts:index')).content
-        self.assertNotEqual(content_add, content_cache_clear)
+        self.assertNotEqual(content_add, content_delete)
+        self.assertNotIn(post.text.encode(), content_delete)
+
+    def test_cache_varies_by_page(self):
+        """Разные страницы ленты кешируются отдельно"""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.user)
+            for i in range(settings.POST_LIST))
+        first = self.guest_client.get(reverse('posts:index')).content
+        second = self.guest_client.get(
+            reverse('posts:index') + '?page=2').content
+        self.assertNotEqual(first, second)
+        self.assertIn(self.post.text.encode(), second)
+
+    def test_cache_group_move(self):
+        """Перенос поста в другую группу сбрасывает кеш обеих групп"""
+        group2 = Group.objects.create(title='Тестовая группа 2',
+                                      slug='test_group2')
+        old_url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        new_url = reverse('posts:group_list', kwargs={'slug': group2.slug})
+        self.assertIn(self.post.text.encode(),
+                      self.guest_client.get(old_url).content)
+        self.guest_client.get(new_url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = group2
+        post.save()
+        self.assertNotIn(self.post.text.encode(),
+                         self.guest_client.get(old_url).content)
+        self.assertIn(self.post.text.encode(),
+                      self.guest_client.get(new_url).content)
 
     def test_post_added_correctly_user2(self):
         """Пост при создании не добавляется другому пользователю
@@ -167,9 +195,10 @@ class ViewsTest(TestCase):
             text='Тестовый коммент').exists())
 
     def test_follow_page(self):
+        self.authorized_client.force_login(self.user2)
         response = self.authorized_client.get(reverse('posts:follow_index'))
         self.assertEqual(len(response.context['page_obj']), 0)
-        Follow.objects.get_or_create(user=self.user, author=self.post.author)
+        Follow.objects.get_or_create(user=self.user2, author=self.post.author)
         r_2 = self.authorized_client.get(reverse('posts:follow_index'))
         self.assertEqual(len(r_2.context['page_obj']), 1)
         self.assertIn(self.post, r_2.context['page_obj'])
@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import call_command
+from django.test import RequestFactory, TransactionTestCase
+from django.urls import reverse
+from posts.cache import feed_cache_context
+from posts.models import Follow, Group, Post, User
+from posts.warmup import targets
+
+
+class WarmFeedsTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='auth')
+        self.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author, group=self.group)
+            for i in range(settings.POST_LIST * 2 + 1))
+        Group.objects.update(posts_count=Post.objects.count())
+
+    def test_targets(self):
+        """Ленты по рангу и только существующие страницы."""
+        urls = targets(pages=5, groups=1, profiles=1)
+        self.assertEqual(len(urls), 9)
+        self.assertEqual(urls[0], reverse('posts:index'))
+        self.assertEqual(urls[3], reverse('posts:group_list',
+                                          kwargs={'slug': 'group'}))
+        self.assertEqual(urls[6], reverse('posts:profile',
+                                          kwargs={'username': 'auth'}))
+        self.assertEqual(len(targets(pages=2, groups=0, profiles=0)), 2)
+
+    def test_command_warms_cache(self):
+        """После прогрева фрагменты лент уже лежат в кеше."""
+        out = StringIO()
+        call_command('warm_feeds', pages=2, workers=2, stdout=out)
+        self.assertIn('Прогрето 6 из 6', out.getvalue())
+        for url in targets(pages=2, groups=0, profiles=0):
+            with self.subTest(url=url):
+                context = feed_cache_context(
+                    RequestFactory().get(url), 'index')
+                key = make_template_fragment_key(
+                    'feed_page', [context['feed_cache_key']])
+                self.assertIn('Пост', cache.get(key))
@@ -0,0 +1,134 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from PIL import Image, ImageOps
+
+from .cache import bump_feeds, feed_names
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Суффикс имени, множитель размера, формат Pillow.
+RENDITIONS = (
+    ('.jpg', 1, 'JPEG'),
+    ('@2x.jpg', 2, 'JPEG'),
+    ('.webp', 1, 'WEBP'),
+    ('@2x.webp', 2, 'WEBP'),
+)
+
+ORIGINAL_FORMATS = ('JPEG', 'PNG', 'WEBP')
+
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails')
+    return _executor
+
+
+def thumbnail_prefix(post_id, image_name):
+    name = os.path.splitext(os.path.basename(image_name))[0]
+    width, height = settings.THUMBNAIL_SIZE
+    return f'thumbs/posts/{post_id}/{name}_{width}x{height}'
+
+
+def render(image, scale, image_format):
+    width, height = settings.THUMBNAIL_SIZE
+    thumb = ImageOps.fit(
+        image, (width * scale, height * scale), method=Image.LANCZOS)
+    buffer = BytesIO()
+    thumb.save(buffer, image_format, quality=settings.THUMBNAIL_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def replace_file(name, content):
+    """Записывает content ровно под именем name, заменяя прежний файл.
+
+    Файл пишется под временным именем и переносится на место одним
+    os.replace: параллельные генерации не плодят имён с суффиксами,
+    а читатель не видит недописанный файл.
+    """
+    temp_name = default_storage.save(f'{name}.{uuid4().hex}.tmp', content)
+    try:
+        os.replace(default_storage.path(temp_name),
+                   default_storage.path(name))
+    except NotImplementedError:
+        # Хранилище без локальных путей перезаписывает файл само.
+        default_storage.delete(temp_name)
+        default_storage.delete(name)
+        default_storage.save(name, content)
+
+
+def shrink_original(image_name, image):
+    """Пережимает слишком большой оригинал, отбрасывая метаданные."""
+    side = settings.POST_IMAGE_MAX_SIDE
+    if max(image.size) <= side or image.format not in ORIGINAL_FORMATS:
+        return
+    shrunk = image.copy()
+    shrunk.thumbnail((side, side), Image.LANCZOS)
+    buffer = BytesIO()
+    shrunk.save(buffer, image.format, quality=settings.THUMBNAIL_QUALITY)
+    replace_file(image_name, ContentFile(buffer.getvalue()))
+
+
+def generate_thumbnails(post_id, image_name):
+    """Готовит оригинал, строит превью и сохраняет префикс их URL в посте."""
+    try:
+        with default_storage.open(image_name) as source:
+            image = Image.open(source)
+            image.load()
+    except Image.DecompressionBombError:
+        logger.warning('Картинка %s поста %s слишком большая',
+                       image_name, post_id)
+        return None
+    except (OSError, ValueError, SuspiciousFileOperation):
+        logger.warning('Не удалось открыть картинку %s поста %s',
+                       image_name, post_id)
+        return None
+    shrink_original(image_name, image)
+    image = image.convert('RGB')
+    prefix = thumbnail_prefix(post_id, image_name)
+    for suffix, scale, image_format in RENDITIONS:
+        replace_file(prefix + suffix, render(image, scale, image_format))
+    url = default_storage.url(prefix)
+    updated = Post.objects.filter(pk=post_id, image=image_name).update(
+        thumbnail=url, version=F('version') + 1)
+    if updated:
+        post = Post.objects.only('author', 'group').get(pk=post_id)
+        bump_feeds(*feed_names(post))
+    return url
+
+
+def _run(post_id, image_name):
+    try:
+        generate_thumbnails(post_id, image_name)
+    except DatabaseError as error:
+        logger.warning('Превью поста %s не сохранены: %s', post_id, error)
+    except Exception:
+        logger.exception('Ошибка генерации превью поста %s', post_id)
+    finally:
+        connection.close()
+
+
+def schedule_thumbnails(post):
+    """Ставит генерацию превью в пул после фиксации транзакции."""
+    post_id, image_name = post.pk, post.image.name
+    if settings.THUMBNAIL_ASYNC:
+        transaction.on_commit(
+            lambda: _pool().submit(_run, post_id, image_name))
+    else:
+        transaction.on_commit(
+            lambda: generate_thumbnails(post_id, image_name))
@@ -0,0 +1,139 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import FEED_FIELDS, AuthorStats, Follow, Post, TimelineEntry
+from .utils import page_obj_func
+
+PULL_AUTHORS_KEY = 'timeline:pull-authors'
+
+
+def pull_authors():
+    """Авторы, чьи посты не рассылаются подписчикам, а подтягиваются."""
+    authors = cache.get(PULL_AUTHORS_KEY)
+    if authors is None:
+        authors = frozenset(AuthorStats.objects.filter(
+            followers_count__gt=settings.TIMELINE_FANOUT_LIMIT).values_list(
+            'user_id', flat=True))
+        cache.set(PULL_AUTHORS_KEY, authors, settings.TIMELINE_PULL_TIMEOUT)
+    return authors
+
+
+def _entries(user_ids, posts):
+    return [
+        TimelineEntry(user_id=user_id, post_id=post.pk,
+                      author_id=post.author_id, pub_date=post.pub_date)
+        for user_id in user_ids for post in posts
+    ]
+
+
+def fan_out(post):
+    """Рассылает новый пост в ленты подписчиков автора.
+
+    Порог сверяется со счётчиком автора, а не с закешированным
+    множеством: устаревшее множество сбрасывается, а если автор из него
+    выпал мимо отписки (например, после reconcile), ленты подписчиков
+    дозаполняются его постами.
+    """
+    followers = AuthorStats.objects.filter(user_id=post.author_id).values_list(
+        'followers_count', flat=True).first() or 0
+    pulled = followers > settings.TIMELINE_FANOUT_LIMIT
+    cached = post.author_id in pull_authors()
+    if pulled != cached:
+        cache.delete(PULL_AUTHORS_KEY)
+        if cached:
+            backfill_followers([post.author_id])
+    if pulled or not followers:
+        return
+    TimelineEntry.objects.bulk_create(
+        _entries(Follow.objects.filter(author_id=post.author_id).values_list(
+            'user_id', flat=True), [post]),
+        batch_size=settings.TIMELINE_BATCH_SIZE, ignore_conflicts=True)
+
+
+def backfill(user_id, *author_ids):
+    """Добавляет в ленту последние посты авторов после подписки.
+
+    Для нескольких авторов берутся TIMELINE_BACKFILL свежих постов на
+    каждого, но по общей дате: это верх ленты, которую увидит читатель.
+    """
+    if not author_ids:
+        return
+    posts = Post.objects.filter(author_id__in=author_ids).only(
+        'pub_date', 'author')[:settings.TIMELINE_BACKFILL * len(author_ids)]
+    TimelineEntry.objects.bulk_create(
+        _entries([user_id], posts),
+        batch_size=settings.TIMELINE_BATCH_SIZE, ignore_conflicts=True)
+
+
+def backfill_followers(author_ids):
+    """Заполняет ленты всех подписчиков авторов их последними постами.
+
+    Посты каждого автора читаются один раз и расходятся подписчикам
+    пакетами bulk_create; авторы без рассылки пропускаются.
+    """
+    pulled = set(AuthorStats.objects.filter(
+        user_id__in=author_ids,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT).values_list(
+        'user_id', flat=True))
+    for author_id in set(author_ids) - pulled:
+        posts = list(Post.objects.filter(author_id=author_id).only(
+            'pub_date', 'author')[:settings.TIMELINE_BACKFILL])
+        if posts:
+            TimelineEntry.objects.bulk_create(
+                _entries(Follow.objects.filter(author_id=author_id)
+                         .values_list('user_id', flat=True), posts),
+                batch_size=settings.TIMELINE_BATCH_SIZE,
+                ignore_conflicts=True)
+
+
+def leave_pull(author_ids):
+    """Возвращает рассылку авторам, чьи подписчики опустились до порога.
+
+    Вызывается после отписки, уменьшившей счётчики на единицу: ровно
+    TIMELINE_FANOUT_LIMIT подписчиков значит, что до неё автор был без
+    рассылки. Его посты того времени не попали в ленты, а подмешиваться
+    при чтении перестанут, поэтому их досылают подписчикам.
+    """
+    left = list(AuthorStats.objects.filter(
+        user_id__in=author_ids,
+        followers_count=settings.TIMELINE_FANOUT_LIMIT).values_list(
+        'user_id', flat=True))
+    if left:
+        cache.delete(PULL_AUTHORS_KEY)
+        backfill_followers(left)
+
+
+def remove(user_id, *author_ids):
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id__in=author_ids).delete()
+
+
+def timeline_entries(user):
+    """Выборка ленты подписок и путь от её строк до полей поста.
+
+    Обычно это записи ленты (prefix 'post__'). Посты авторов без
+    рассылки подмешиваются при чтении: тогда выборка идёт по постам
+    (prefix ''), а чтение ленты ничего не пишет.
+    """
+    entries = TimelineEntry.objects.filter(user=user)
+    authors = pull_authors()
+    pulled = list(Follow.objects.filter(
+        user=user, author_id__in=authors).values_list(
+        'author_id', flat=True)) if authors else []
+    if not pulled:
+        return entries, 'post__'
+    return Post.objects.filter(
+        Q(pk__in=entries.values('post_id')) | Q(author_id__in=pulled)), ''
+
+
+def timeline_page(user, request):
+    """Страница ленты подписок: один проход по индексу ленты."""
+    rows, prefix = timeline_entries(user)
+    if not prefix:
+        return page_obj_func(rows.for_feed(), request)
+    entries = rows.select_related('post__author', 'post__group').only(
+        'pub_date', 'post', *(f'post__{field}' for field in FEED_FIELDS))
+    page = page_obj_func(entries, request)
+    page.object_list = [entry.post for entry in page.object_list]
+    return page
@@ -1,9 +1,108 @@
+import base64
+import binascii
+from contextlib import contextmanager
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Post
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+def encode_cursor(direction, pub_date, pk):
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор в (направление, дата, id) или возвращает None."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+    if direction not in (FORWARD, BACKWARD) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class KeysetPaginator(Paginator):
+    """Пагинация по ключу (date_field, id) без COUNT(*) и OFFSET.
+
+    Страница по курсору строится одним запросом LIMIT per_page + 1.
+    Обычный get_page(number) остаётся для совместимости с ?page=N.
+    Строки могут быть и моделями, и словарями из values() с date_field
+    и id.
+    """
+
+    def __init__(self, object_list, per_page, date_field='pub_date',
+                 **kwargs):
+        self.date_field = date_field
+        super().__init__(object_list.order_by(f'-{date_field}', '-id'),
+                         per_page, **kwargs)
+
+    def position(self, row):
+        if isinstance(row, dict):
+            return row[self.date_field], row['id']
+        return getattr(row, self.date_field), row.pk
+
+    def seek(self, direction, date, pk):
+        lookup = 'lt' if direction == FORWARD else 'gt'
+        return self.object_list.filter(
+            Q(**{f'{self.date_field}__{lookup}': date})
+            | Q(**{self.date_field: date, f'pk__{lookup}': pk}))
+
+    def get_cursor_page(self, cursor=None):
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            direction, queryset = FORWARD, self.object_list
+        else:
+            direction, date, pk = position
+            queryset = self.seek(direction, date, pk)
+            if direction == BACKWARD:
+                queryset = queryset.reverse()
+        posts = list(queryset[:self.per_page + 1])
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        if direction == BACKWARD:
+            posts.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+        page = Page(posts, None, self)
+        page.is_keyset = True
+        page.next_cursor = (
+            encode_cursor(FORWARD, *self.position(posts[-1]))
+            if has_next and posts else None)
+        page.previous_cursor = (
+            encode_cursor(BACKWARD, *self.position(posts[0]))
+            if has_previous and posts else None)
+        return page
 
 
 def page_obj_func(place_page, request):
-    paginator = Paginator(place_page, settings.POST_LIST)
+    paginator = KeysetPaginator(place_page, settings.POST_LIST)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return page_obj
+    if page_number is not None:
+        return paginator.get_page(page_number)
+    return paginator.get_cursor_page(request.GET.get('cursor'))
+
+
+@contextmanager
+def keep_timestamps():
+    """Отключает auto_now_add, чтобы сохранить даты из выгрузки."""
+    fields = (Post._meta.get_field('pub_date'),
+              Comment._meta.get_field('created'))
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
@@ -1,54 +1,112 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
+from posts.cache import feed_cache_context, feed_condition
+from posts.comments import thread_page
+from posts.counters import author_posts_count
+from posts.search import SearchPaginator
+from posts.timeline import timeline_page
+from posts.uploads import image_uploads
 from posts.utils import page_obj_func
 
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post, User
+from .models import Follow, Group, Post, User
+
+
+def lookup(queryset, field, **lookups):
+    """Одно поле по уникальному ключу без загрузки объекта."""
+    return queryset.filter(**lookups).values_list(field, flat=True).first()
+
+
+def render_feed(request, view, template_name, context):
+    """render ленты движком из FEED_TEMPLATE_ENGINES, по умолчанию Django."""
+    return render(request, template_name, context,
+                  using=settings.FEED_TEMPLATE_ENGINES.get(view))
+
+
+def group_feeds(request, slug):
+    pk = lookup(Group.objects, 'pk', slug=slug)
+    return None if pk is None else [f'group:{pk}']
 
 
+def profile_feeds(request, username):
+    pk = lookup(User.objects, 'pk', username=username)
+    return None if pk is None else [f'profile:{pk}']
+
+
+def post_feeds(request, post_id):
+    author_id = lookup(Post.objects, 'author_id', pk=post_id)
+    return None if author_id is None else [f'profile:{author_id}']
+
+
+@feed_condition(lambda request: ['index'])
 def index(request):
     context = {
-        'page_obj': page_obj_func(Post.objects.all(), request),
+        'page_obj': page_obj_func(Post.objects.for_feed(), request),
+        **feed_cache_context(request, 'index'),
     }
-    return render(request, 'posts/index.html', context)
+    return render_feed(request, 'index', 'posts/index.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    context = {'query': query, 'page_query': urlencode({'q': query}) + '&'}
+    if query:
+        context['page_obj'] = SearchPaginator(
+            query, settings.POST_LIST).get_cursor_page(
+                request.GET.get('cursor'))
+    return render(request, 'posts/search.html', context)
+
+
+@feed_condition(group_feeds)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     context = {'group': group, 'page_obj': page_obj_func(
-        group.group.all(), request), }
-    return render(request, 'posts/group_list.html', context)
+        group.group.for_feed(), request),
+        **feed_cache_context(request, f'group:{group.pk}'), }
+    return render_feed(request, 'group_posts', 'posts/group_list.html',
+                       context)
 
 
+@feed_condition(profile_feeds)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
-    count_post = Post.objects.filter(author=user).count()
-    following = user.following.exists()
+    user = get_object_or_404(
+        User.objects.select_related('stats'), username=username)
+    count_post = author_posts_count(user)
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=user).exists()
 
     context = {
-        'page_obj': page_obj_func(user.posts.all(), request),
+        'page_obj': page_obj_func(user.posts.for_feed(), request),
         'author': user, 'count': count_post,
         'following': following,
+        **feed_cache_context(request, f'profile:{user.pk}'),
     }
-    return render(request, 'posts/profile.html', context)
+    return render_feed(request, 'profile', 'posts/profile.html', context)
 
 
+@feed_condition(post_feeds)
 def post_detail(request, post_id):
-    form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, pk=post_id)
-    comments = Comment.objects.filter(post=post)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id)
+    reply = request.GET.get('reply', '')
     context = {
         'post': post,
+        'count': author_posts_count(post.author),
         'is_author': post.author == request.user,
-        'comments': comments,
-        'form': form,
+        'comments': thread_page(post, request),
+        'form': CommentForm(post=post),
+        'reply': reply if reply.isdigit() else None,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@image_uploads
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     context = {
         'form': form,
         'is_edit': False
@@ -63,10 +121,11 @@ def post_create(request):
     return render(request, 'posts/create_post.html', context)
 
 
+@image_uploads
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
-    if request.user != post.author:
+    if request.user.id != post.author_id:
         return redirect('posts:post_detail', post_id)
     form = PostForm(
         request.POST or None,
@@ -82,7 +141,7 @@ def post_edit(request, post_id):
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
-    form = CommentForm(request.POST or None)
+    form = CommentForm(request.POST or None, post=post)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
@@ -93,15 +152,13 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    follower = Follow.objects.filter(user=request.user).values_list(
-        'author_id', flat=True
-    )
-    posts = Post.objects.filter(author_id__in=follower)
     context = {
-        'page_obj': page_obj_func(posts, request),
+        'page_obj': timeline_page(request.user, request),
         'title': 'Избранные посты',
+        **feed_cache_context(
+            request, 'index', f'follow:{request.user.pk}'),
     }
-    return render(request, 'posts/follow.html', context)
+    return render_feed(request, 'follow_index', 'posts/follow.html', context)
 
 
 @login_required
@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from .models import AuthorStats, Group, Post
+from .utils import FORWARD, KeysetPaginator, encode_cursor
+
+
+def page_urls(url, queryset, pages):
+    """Адреса первых pages страниц ленты с курсорами, как у пагинатора.
+
+    Курсоры берутся из одного запроса по (pub_date, id), без рендера
+    предыдущих страниц.
+    """
+    ordered = KeysetPaginator(queryset, settings.POST_LIST).object_list
+    keys = list(ordered.values_list('pub_date', 'id')[
+        :settings.POST_LIST * (pages - 1) + 1])
+    urls = [url]
+    for page in range(1, pages):
+        if len(keys) <= settings.POST_LIST * page:
+            break
+        cursor = encode_cursor(FORWARD, *keys[settings.POST_LIST * page - 1])
+        urls.append(f'{url}?{urlencode({"cursor": cursor})}')
+    return urls
+
+
+def targets(pages, groups, profiles):
+    """Горячие ленты: главная, крупнейшие группы и авторы с подписчиками.
+
+    Группы ранжируются по posts_count, авторы — по индексированному
+    AuthorStats.followers_count, без подсчёта по таблице подписок.
+    """
+    urls = page_urls(reverse('posts:index'), Post.objects.all(), pages)
+    for group in Group.objects.order_by('-posts_count').only(
+            'slug')[:groups]:
+        urls += page_urls(
+            reverse('posts:group_list', kwargs={'slug': group.slug}),
+            Post.objects.filter(group=group), pages)
+    authors = AuthorStats.objects.filter(followers_count__gt=0).order_by(
+        '-followers_count').select_related('user').only(
+        'user__username')[:profiles]
+    for stats in authors:
+        urls += page_urls(
+            reverse('posts:profile', kwargs={'username': stats.user.username}),
+            Post.objects.filter(author_id=stats.user_id), pages)
+    return urls
+
+
+def fetch(url, host):
+    """Рендерит страницу гостем; фрагменты ленты общие для всех."""
+    started = time.perf_counter()
+    try:
+        status = Client(HTTP_HOST=host).get(url).status_code
+    finally:
+        connections.close_all()
+    return url, status, time.perf_counter() - started
+
+
+def warm(urls, workers, host, on_done=None):
+    """Прогревает адреса пулом из workers потоков, возвращает замеры."""
+    results = []
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix='warmup') as executor:
+        futures = [executor.submit(fetch, url, host) for url in urls]
+        for future in as_completed(futures):
+            results.append(future.result())
+            if on_done is not None:
+                on_done(len(results), len(urls))
+    return results
@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from jinja2 import Environment, Undefined
+from markupsafe import Markup
+from posts.templatetags.post_cards import render_cards
+
+ENGINE = 'jinja2'
+CARD_KEY = 'post-card-jinja2:{}:{}:{}:{}'
+
+
+def url(name, *args, **kwargs):
+    """{% url %}: адрес по имени маршрута."""
+    return reverse(name, args=args, kwargs=kwargs)
+
+
+def date(value, arg=None):
+    """|date, как в шаблонах Django: сначала в местное время."""
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def cached(name, key, timeout, caller):
+    """{% cache %}: {% call cached(...) %}фрагмент{% endcall %}.
+
+    Ключ строится как у тега Django, но имя фрагмента своё: разметка
+    движков не обязана совпадать байт в байт.
+    """
+    fragment_key = make_template_fragment_key(name, [key])
+    fragment = cache.get(fragment_key)
+    if fragment is None:
+        fragment = str(caller())
+        cache.set(fragment_key, fragment, timeout)
+    return Markup(fragment)
+
+
+def post_cards(posts, template_name):
+    """{% post_cards %}: карточки постов, отрендеренные Jinja2."""
+    return render_cards(posts, template_name, CARD_KEY, using=ENGINE)
+
+
+def environment(**options):
+    """Окружение Jinja2 для лент с помощниками вместо тегов Django.
+
+    Отсутствующая переменная выводится пустой строкой, как в шаблонах
+    Django, а не текстом {{ имя }}, как DebugUndefined при DEBUG.
+    """
+    options['undefined'] = Undefined
+    env = Environment(**options)
+    env.globals.update({
+        'url': url,
+        'static': static,
+        'cached': cached,
+        'post_cards': post_cards,
+    })
+    env.filters.update({
+        'date': date,
+        'linebreaksbr': defaultfilters.linebreaksbr,
+        'urlencode': defaultfilters.urlencode,
+    })
+    return env
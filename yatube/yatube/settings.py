@@ -1,4 +1,8 @@
+import hashlib
 import os
+import sys
+import tempfile
+from importlib.util import find_spec
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -6,6 +10,13 @@ SECRET_KEY = '8j5-9^3i9sgb4@7tvh+eoxfxlra=wf7v--rukz6^9h618ykwo@'
 
 DEBUG = True
 
+# production: BEGIN IMMEDIATE с очередью писателей, постоянные соединения
+# и шаблоны, разобранные один раз на процесс.
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'development')
+
+# Запуск тестов (manage.py test или pytest): фоновые пулы выключены.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -32,23 +43,37 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'posts.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+# Кешированный загрузчик: без него каждый рендер читает и разбирает файлы.
+TEMPLATE_CACHE = DATABASE_PROFILE == 'production' or not DEBUG
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.templates.DjangoTemplates',
+        'NAME': 'django',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': [('django.template.loaders.cached.Loader',
+                         TEMPLATE_LOADERS)]
+            if TEMPLATE_CACHE else TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -60,15 +85,81 @@ TEMPLATES = [
     },
 ]
 
+# Ленты на Jinja2 (необязательная зависимость): шаблоны в jinja2/.
+if find_spec('jinja2') is not None:
+    TEMPLATES.append({
+        'BACKEND': 'core.templates.Jinja2',
+        'NAME': 'jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+        'OPTIONS': {
+            'environment': 'yatube.jinja2.environment',
+            'auto_reload': not TEMPLATE_CACHE,
+            'context_processors': [
+                'django.contrib.auth.context_processors.auth',
+                'core.context_processors.year.year',
+            ],
+        },
+    })
+
+# Движок шаблонов по view ленты: {'index': 'jinja2', ...}; иначе Django.
+FEED_TEMPLATE_ENGINES = {}
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Выполняются на каждом новом соединении с файлом SQLite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+# Периодичность обслуживания базы для sqlite_maintenance --loop, секунды.
+SQLITE_MAINTENANCE = {
+    'checkpoint': 5 * 60,
+    'analyze': 60 * 60,
+    'vacuum': 7 * 24 * 60 * 60,
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.sqlite',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 600 if DATABASE_PROFILE == 'production' else 0,
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+            'timeout': 5,
+            'immediate': DATABASE_PROFILE == 'production',
+        },
     }
 }
 
+# Реплики только для чтения: пути к копиям SQLite через запятую.
+REPLICA_DATABASES = []
+for number, name in enumerate(filter(None, os.environ.get(
+        'DATABASE_REPLICAS', '').split(','))):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        'ENGINE': 'core.sqlite',
+        'NAME': name,
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'OPTIONS': {
+            'pragmas': {**SQLITE_PRAGMAS, 'query_only': 'ON'},
+            'timeout': 5,
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Сколько секунд после записи клиент читает только из primary.
+REPLICA_PIN_SECONDS = 15
+
+REPLICA_PIN_COOKIE = 'pin_primary'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -108,17 +199,137 @@ EMPTY_VALUE_DISPLAY = '-пусто-'
 
 POST_LIST = 10
 
+# Наибольший ?limit= страницы в JSON API.
+API_MAX_LIMIT = 100
+# Наибольший пакет имён или id в пакетных запросах API.
+API_BATCH_LIMIT = 100
+
 LEN_OF_POSTS = 15
 
+COMMENT_LIST = 20
+
+COMMENT_MAX_DEPTH = 8
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 6
+
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+TIMELINE_FANOUT_LIMIT = 1000
+
+TIMELINE_BACKFILL = 100
+
+TIMELINE_BATCH_SIZE = 500
+
+TIMELINE_PULL_TIMEOUT = 60 * 10
+
+THUMBNAIL_SIZE = (960, 339)
+
+THUMBNAIL_QUALITY = 85
+
+THUMBNAIL_WORKERS = 2
+
+# В тестах превью строятся сразу после фиксации: пул пережил бы тест
+# и писал бы в чужие MEDIA_ROOT и базу.
+THUMBNAIL_ASYNC = not TESTING
+
+POST_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 40 * 1000 * 1000
+
+POST_IMAGE_MAX_SIDE = 2560
+
+# Класс поиска по постам; для других БД — posts.search.LikeBackend.
+SEARCH_BACKEND = 'posts.search.SqliteFTSBackend'
+
+SEARCH_MAX_TERMS = 8
+
+SEARCH_ADMIN_LIMIT = 1000
+
+# Доля запросов с подробным замером SQL, шаблонов и кеша в лог.
+REQUEST_TIMING_SAMPLE_RATE = 0.01
+# Значение заголовка X-Request-Timing, включающее замер для запроса;
+# Server-Timing получают только такие запросы и сотрудники.
+REQUEST_TIMING_TOKEN = os.environ.get('REQUEST_TIMING_TOKEN', '')
+# Запросы дольше порога пишутся в лог всегда.
+REQUEST_TIMING_SLOW_MS = 500
+# Сколько самых частых повторов запросов показывать.
+REQUEST_TIMING_DUPLICATES = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yatube.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# default — LRU процесса перед общим для всех воркеров кешем shared.
+# Для memcached: CACHE_BACKEND=django.core.cache.backends.memcached.
+# PyLibMCCache и CACHE_LOCATION=127.0.0.1:11211.
+# Каталог файлового кеша свой у каждой копии проекта, а у тестов —
+# отдельный: прогон тестов не чистит и не читает кеш разработки.
+CACHE_DIR = os.path.join(tempfile.gettempdir(), '{}-{}'.format(
+    'yatube-test-cache' if TESTING else 'yatube-cache',
+    hashlib.md5(BASE_DIR.encode()).hexdigest()[:8]))
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'L1_TIMEOUT': 5,
+            'L1_MAX_ENTRIES': 1000,
+            # Изменяемые ключи: версии лент, состояние ленты подписок,
+            # сессии и пользователи — выход и смена пароля видны сразу.
+            'SHARED_ONLY': ('feed:version:', 'timeline:',
+                            'django.contrib.sessions.', 'user:'),
+            # Ключи, которые считает только один процесс за раз.
+            'SINGLE_FLIGHT': ('template.cache.',
+                              'views.decorators.cache.cache_page.'),
+            'LOCK_TIMEOUT': 10,
+            'LOCK_WAIT': 1.0,
+            'EARLY_REFRESH_BETA': 1.0,
+        },
+    },
+    'shared': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_DIR),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
+
+# Сессии в кеше с записью в базу: вошедший пользователь не читает
+# django_session на каждом запросе.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Страницы лент для гостей: сбрасываются версиями лент, таймаут — запас.
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Surrogate-Control для обратного прокси; сброс — по Surrogate-Key.
+EDGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Адрес сброса по ключам на прокси (Fastly: .../service/<id>/purge).
+EDGE_PURGE_URL = os.environ.get('EDGE_PURGE_URL', '')
+EDGE_PURGE_HEADERS = {'Fastly-Key': os.environ['EDGE_PURGE_TOKEN']} if (
+    'EDGE_PURGE_TOKEN' in os.environ) else {}
+EDGE_PURGE_TIMEOUT = 2
+
+# Сколько секунд пользователь запроса живёт в кеше (core.auth).
+USER_CACHE_TIMEOUT = 60 * 60
+
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission_denied'
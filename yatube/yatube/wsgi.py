@@ -5,3 +5,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATE_CACHE:
+    # Шаблоны разбираются до первого запроса; с ошибкой воркер не стартует.
+    from core.precompile import compile_templates  # noqa: E402
+
+    _, errors = compile_templates()
+    if errors:
+        raise RuntimeError('Шаблоны с ошибками: ' + ', '.join(
+            f'{name} ({error})' for name, error in errors))